@@ -2,16 +2,14 @@ from __future__ import annotations
 
 import asyncio
 from collections.abc import Coroutine
-from functools import wraps
+from functools import partial, wraps
 import logging
 
 from ssh_terminal_manager import (
     ActionKey,
-    Command,
     CommandOutput,
     SensorKey,
     SSHManager,
-    SSHTerminal,
 )
 import voluptuous as vol
 
@@ -37,16 +35,19 @@ from homeassistant.core import (
     ServiceValidationError,
     SupportsResponse,
 )
-from homeassistant.helpers import device_registry as dr, entity_platform
-from homeassistant.helpers.service import (
-    async_extract_config_entry_ids,
-    async_extract_entities,
-)
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.service import async_extract_config_entry_ids
+from homeassistant.util import slugify
 
-from .base_entity import BaseSensorEntity
+from .async_terminal import AsyncSSHTerminal
+from .batch import async_set_sensor_values
+from .coalesce import RequestCoalescer
 from .const import (
     CONF_ALLOW_TURN_OFF,
+    CONF_BACKEND,
     CONF_COMMAND_TIMEOUT,
+    CONF_COMPRESS,
+    CONF_DEADLINE,
     CONF_DISCONNECT_MODE,
     CONF_DYNAMIC,
     CONF_HOST_KEYS_FILENAME,
@@ -54,13 +55,27 @@ from .const import (
     CONF_KEY,
     CONF_KEY_FILENAME,
     CONF_LOAD_SYSTEM_HOST_KEYS,
+    CONF_LOCAL_PATH,
+    CONF_MAX_PARALLEL,
+    CONF_PERSISTENT_SHELL,
+    CONF_POLL_FRESHNESS,
     CONF_POWER_BUTTON,
+    CONF_REMOTE_PATH,
+    CONF_RESUME,
     CONF_SENSOR_COMMANDS,
     CONF_SENSORS,
     CONF_SEPARATOR,
+    CONF_SHARE_LATEST,
     CONF_UPDATE_INTERVAL,
     CONF_VALUES,
+    DEFAULT_BACKEND,
+    DEFAULT_COMPRESS,
+    DEFAULT_MAX_PARALLEL,
+    DEFAULT_PERSISTENT_SHELL,
+    DEFAULT_POLL_FRESHNESS,
+    DEFAULT_SHARE_LATEST,
     DOMAIN,
+    SERVICE_DOWNLOAD_FILE,
     SERVICE_EXECUTE_COMMAND,
     SERVICE_POLL_SENSOR,
     SERVICE_RESTART,
@@ -68,15 +83,34 @@ from .const import (
     SERVICE_SET_VALUE,
     SERVICE_TURN_OFF,
     SERVICE_TURN_ON,
+    SERVICE_UPLOAD_FILE,
 )
 from .converter import Converter
-from .coordinator import SensorCommandCoordinator, StateCoordinator
+from .coordinator import (
+    DISCONNECT_MODE_DELAY,
+    SensorCommandCoordinator,
+    StateCoordinator,
+)
 from .entry_data import EntryData
+from .execute import (
+    async_execute_command_on_entries,
+    async_get_command_result,
+)
 from .helpers import (
-    get_command_renderer,
     get_device_info,
     get_device_sensor_update_handler,
+    get_target_entity_ids,
+    get_target_sensor_entities,
 )
+from .lookup import SharedLookups
+from .output import unlimited_output
+from .priority import PriorityLock
+from .tail import async_setup_tail_commands
+from .terminal import BaseSharedTerminal, SharedSSHTerminal
+from .transfer import TransferResult, async_transfer
+from .watch import async_setup_file_watch
+from .websocket import async_register_websocket_commands
+from .worker import ProcessSSHTerminal, async_get_worker_pool
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -111,6 +145,10 @@ EXECUTE_COMMAND_SCHEMA = vol.Schema(
         vol.Required(CONF_COMMAND): str,
         vol.Optional(CONF_TIMEOUT): int,
         vol.Optional(CONF_VARIABLES): dict,
+        vol.Optional(CONF_MAX_PARALLEL, default=DEFAULT_MAX_PARALLEL): vol.All(
+            int, vol.Range(min=1)
+        ),
+        vol.Optional(CONF_DEADLINE): vol.All(int, vol.Range(min=1)),
         vol.Optional(ATTR_DEVICE_ID): list,
         vol.Optional(ATTR_ENTITY_ID): list,
     }
@@ -125,6 +163,16 @@ RUN_ACTION_SCHEMA = vol.Schema(
     }
 )
 
+TRANSFER_FILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_LOCAL_PATH): str,
+        vol.Required(CONF_REMOTE_PATH): str,
+        vol.Optional(CONF_RESUME, default=False): bool,
+        vol.Optional(ATTR_DEVICE_ID): list,
+        vol.Optional(ATTR_ENTITY_ID): list,
+    }
+)
+
 SET_VALUE_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_VALUES): list,
@@ -175,8 +223,23 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry):
         if entry.minor_version < 2:
             new_options[CONF_POWER_BUTTON] = True
 
+        if entry.minor_version < 3:
+            new_data[CONF_BACKEND] = DEFAULT_BACKEND
+
+        if entry.minor_version < 4:
+            new_options[CONF_POLL_FRESHNESS] = DEFAULT_POLL_FRESHNESS
+
+        if entry.minor_version < 5:
+            new_data[CONF_COMPRESS] = DEFAULT_COMPRESS
+
+        if entry.minor_version < 6:
+            new_options[CONF_SHARE_LATEST] = DEFAULT_SHARE_LATEST
+
+        if entry.minor_version < 7:
+            new_data[CONF_PERSISTENT_SHELL] = DEFAULT_PERSISTENT_SHELL
+
         hass.config_entries.async_update_entry(
-            entry, data=new_data, options=new_options, minor_version=2, version=2
+            entry, data=new_data, options=new_options, minor_version=7, version=2
         )
 
     _LOGGER.debug(
@@ -193,16 +256,30 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     data = entry.data
     options = entry.options
 
-    terminal = SSHTerminal(
-        data[CONF_HOST],
-        port=data[CONF_PORT],
-        username=data.get(CONF_USERNAME),
-        password=data.get(CONF_PASSWORD),
-        key_filename=data.get(CONF_KEY_FILENAME),
-        host_keys_filename=data.get(CONF_HOST_KEYS_FILENAME),
-        load_system_host_keys=data[CONF_LOAD_SYSTEM_HOST_KEYS],
-        invoke_shell=data[CONF_INVOKE_SHELL],
-    )
+    terminal_kwargs = {
+        "port": data[CONF_PORT],
+        "username": data.get(CONF_USERNAME),
+        "password": data.get(CONF_PASSWORD),
+        "key_filename": data.get(CONF_KEY_FILENAME),
+        "host_keys_filename": data.get(CONF_HOST_KEYS_FILENAME),
+        "load_system_host_keys": data[CONF_LOAD_SYSTEM_HOST_KEYS],
+        "invoke_shell": data[CONF_INVOKE_SHELL],
+        "persistent_shell": data[CONF_PERSISTENT_SHELL],
+        "compress": data[CONF_COMPRESS],
+    }
+
+    if data[CONF_BACKEND] == "process":
+        pool = await async_get_worker_pool(hass)
+        terminal = ProcessSSHTerminal(
+            data[CONF_HOST],
+            worker=pool.get_worker(data[CONF_HOST]),
+            **terminal_kwargs,
+        )
+        entry.async_on_unload(terminal.async_close)
+    elif data[CONF_BACKEND] == "asyncio":
+        terminal = AsyncSSHTerminal(data[CONF_HOST], **terminal_kwargs)
+    else:
+        terminal = SharedSSHTerminal(data[CONF_HOST], **terminal_kwargs)
 
     manager = SSHManager(
         terminal,
@@ -210,12 +287,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         command_timeout=options[CONF_COMMAND_TIMEOUT],
         allow_turn_off=options[CONF_ALLOW_TURN_OFF],
         disconnect_mode=options[CONF_DISCONNECT_MODE],
+        disconnect_mode_delay=DISCONNECT_MODE_DELAY,
         mac_address=data[CONF_MAC],
         collection=Converter(hass).get_collection(options),
         logger=_LOGGER,
     )
+    manager.lock = PriorityLock()
+
+    if options[CONF_SHARE_LATEST]:
+        terminal.lookups = SharedLookups(manager, options[CONF_SHARE_LATEST])
 
     await manager.async_load_host_keys()
+    await async_setup_tail_commands(hass, entry, manager)
 
     await async_initialize_entry(
         hass,
@@ -223,9 +306,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         manager,
         PLATFORMS,
         ignored_action_keys=[ActionKey.TURN_OFF],
+        terminal=terminal,
+    )
+
+    entry_data: EntryData = hass.data[DOMAIN][entry.entry_id]
+    await async_setup_file_watch(
+        hass, entry, manager, terminal, entry_data.command_coordinators
     )
 
     async_register_services(hass, DOMAIN)
+    async_register_websocket_commands(hass)
 
     return True
 
@@ -254,6 +344,7 @@ async def async_initialize_entry(
     platforms: list[Platform],
     ignored_action_keys: list[ActionKey] | None = None,
     ignored_sensor_keys: list[SensorKey] | None = None,
+    terminal: BaseSharedTerminal | None = None,
 ):
     """Initialize a config entry."""
     state_coordinator = StateCoordinator(
@@ -270,9 +361,11 @@ async def async_initialize_entry(
         manager,
         state_coordinator,
         command_coordinators,
+        RequestCoalescer(manager, entry.options[CONF_POLL_FRESHNESS]),
         platforms,
         ignored_action_keys,
         ignored_sensor_keys,
+        terminal,
     )
 
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
@@ -319,29 +412,23 @@ def async_register_services(hass: HomeAssistant, domain: str):
 
         return wrapper
 
+    def get_target_response(coro: Coroutine):
+        @wraps(coro)
+        async def wrapper(call: ServiceCall) -> ServiceResponse | None:
+            entity_ids = get_target_entity_ids(hass, call)
+            return await get_response(partial(coro, entity_ids=entity_ids))(call)
+
+        return wrapper
+
     def get_command_result(coro: Coroutine):
         @wraps(coro)
         async def wrapper(entry_data: EntryData, call: ServiceCall) -> list[dict]:
             try:
-                output: CommandOutput = await coro(entry_data, call)
+                with unlimited_output():
+                    output: CommandOutput = await coro(entry_data, call)
             except Exception as exc:  # noqa: BLE001
-                result = {
-                    "device_id": entry_data.device_entry.id,
-                    "device_name": entry_data.device_entry.name,
-                    "success": False,
-                    "error": str(exc),
-                }
-            else:
-                result = {
-                    "device_id": entry_data.device_entry.id,
-                    "device_name": entry_data.device_entry.name,
-                    "success": True,
-                    "command": output.command_string,
-                    "stdout": output.stdout,
-                    "stderr": output.stderr,
-                    "code": output.code,
-                }
-            return [result]
+                return [await async_get_command_result(hass, entry_data, exc=exc)]
+            return [await async_get_command_result(hass, entry_data, output)]
 
         return wrapper
 
@@ -367,41 +454,27 @@ def async_register_services(hass: HomeAssistant, domain: str):
 
         return wrapper
 
-    @get_response
-    @get_command_result
-    async def execute_command(
-        entry_data: EntryData, call: ServiceCall
-    ) -> CommandOutput:
-        command = Command(
-            call.data[CONF_COMMAND],
-            timeout=call.data.get(CONF_TIMEOUT),
-            renderer=get_command_renderer(hass),
+    async def execute_command(call: ServiceCall) -> ServiceResponse | None:
+        entry_ids = await async_extract_config_entry_ids(hass, call)
+        results = await async_execute_command_on_entries(
+            hass, [hass.data[domain][entry_id] for entry_id in entry_ids], call.data
         )
-        variables = call.data.get(CONF_VARIABLES)
-        return await entry_data.manager.async_execute_command(command, variables)
+        return {"results": results} if call.return_response else None
 
     @get_response
     @get_command_result
     async def run_action(entry_data: EntryData, call: ServiceCall) -> CommandOutput:
         action_key = call.data[CONF_KEY]
         variables = call.data.get(CONF_VARIABLES)
-        return await entry_data.manager.async_run_action(action_key, variables)
+        return await entry_data.coalescer.async_run_action(action_key, variables)
 
-    @get_response
-    async def poll_sensor(entry_data: EntryData, call: ServiceCall) -> list[dict]:
-        entities = [
-            entity
-            for platform in entity_platform.async_get_platforms(hass, domain)
-            for entity in platform.entities.values()
-            if isinstance(entity, BaseSensorEntity)
-            and entity.coordinator == entry_data.state_coordinator
-        ]
-        selected_entities = await async_extract_entities(hass, entities, call)
+    @get_target_response
+    async def poll_sensor(
+        entry_data: EntryData, call: ServiceCall, entity_ids: list[str] | None
+    ) -> list[dict]:
+        selected_entities = get_target_sensor_entities(entry_data, entity_ids)
         sensor_keys = [entity.key for entity in selected_entities]
-        sensors, errors = await entry_data.manager.async_poll_sensors(
-            sensor_keys,
-            raise_errors=False,
-        )
+        _, errors = await entry_data.coalescer.async_poll_sensors(sensor_keys)
         return [
             {
                 "entity_id": entity.entity_id,
@@ -412,24 +485,21 @@ def async_register_services(hass: HomeAssistant, domain: str):
             for i, entity in enumerate(selected_entities)
         ]
 
-    @get_response
-    async def set_value(entry_data: EntryData, call: ServiceCall) -> list[dict]:
+    @get_target_response
+    async def set_value(
+        entry_data: EntryData, call: ServiceCall, entity_ids: list[str] | None
+    ) -> list[dict]:
         values = call.data[CONF_VALUES]
-        entities = [
-            entity
-            for platform in entity_platform.async_get_platforms(hass, domain)
-            for entity in platform.entities.values()
-            if isinstance(entity, BaseSensorEntity)
-            and entity.coordinator == entry_data.state_coordinator
-        ]
-        selected_entities = await async_extract_entities(hass, entities, call)
+        selected_entities = get_target_sensor_entities(entry_data, entity_ids)
         if len(selected_entities) > len(values):
             raise ServiceValidationError("Not all values provided")
         sensor_keys = [entity.key for entity in selected_entities]
-        sensors, errors = await entry_data.manager.async_set_sensor_values(
+        _, errors = await async_set_sensor_values(
+            entry_data.manager,
             sensor_keys,
             values,
-            raise_errors=False,
+            command_timeout=entry_data.config_entry.options[CONF_COMMAND_TIMEOUT],
+            invoke_shell=entry_data.config_entry.data[CONF_INVOKE_SHELL],
         )
         return [
             {
@@ -441,6 +511,62 @@ def async_register_services(hass: HomeAssistant, domain: str):
             for i, entity in enumerate(selected_entities)
         ]
 
+    def get_transfer_result(coro: Coroutine):
+        @wraps(coro)
+        async def wrapper(entry_data: EntryData, call: ServiceCall) -> list[dict]:
+            local_path = call.data[CONF_LOCAL_PATH].replace(
+                "{device_name}", slugify(entry_data.device_entry.name)
+            )
+            try:
+                if not hass.config.is_allowed_path(local_path):
+                    raise ServiceValidationError(f"Path not allowed: {local_path}")
+                transfer: TransferResult = await async_transfer(
+                    entry_data.manager,
+                    entry_data.config_entry.options[CONF_DISCONNECT_MODE],
+                    lambda: coro(entry_data, call, local_path),
+                )
+            except Exception as exc:  # noqa: BLE001
+                result = {
+                    "device_id": entry_data.device_entry.id,
+                    "device_name": entry_data.device_entry.name,
+                    "success": False,
+                    "error": str(exc),
+                }
+            else:
+                result = {
+                    "device_id": entry_data.device_entry.id,
+                    "device_name": entry_data.device_entry.name,
+                    "success": True,
+                    "local_path": local_path,
+                    "remote_path": call.data[CONF_REMOTE_PATH],
+                    "size": transfer.size,
+                    "offset": transfer.offset,
+                    "transferred": transfer.transferred,
+                    "duration": round(transfer.duration, 3),
+                    "throughput": round(transfer.throughput),
+                }
+            return [result]
+
+        return wrapper
+
+    @get_response
+    @get_transfer_result
+    async def upload_file(
+        entry_data: EntryData, call: ServiceCall, local_path: str
+    ) -> TransferResult:
+        return await entry_data.terminal.async_upload(
+            local_path, call.data[CONF_REMOTE_PATH], call.data[CONF_RESUME]
+        )
+
+    @get_response
+    @get_transfer_result
+    async def download_file(
+        entry_data: EntryData, call: ServiceCall, local_path: str
+    ) -> TransferResult:
+        return await entry_data.terminal.async_download(
+            call.data[CONF_REMOTE_PATH], local_path, call.data[CONF_RESUME]
+        )
+
     @get_response
     @get_generic_result
     async def turn_on(entry_data: EntryData, call: ServiceCall) -> None:
@@ -511,3 +637,19 @@ def async_register_services(hass: HomeAssistant, domain: str):
         None,
         SupportsResponse.OPTIONAL,
     )
+
+    hass.services.async_register(
+        domain,
+        SERVICE_UPLOAD_FILE,
+        upload_file,
+        TRANSFER_FILE_SCHEMA,
+        SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        domain,
+        SERVICE_DOWNLOAD_FILE,
+        download_file,
+        TRANSFER_FILE_SCHEMA,
+        SupportsResponse.OPTIONAL,
+    )
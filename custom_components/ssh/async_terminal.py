@@ -0,0 +1,390 @@
+"""Asyncio SSH terminal of the SSH integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Sequence
+import os
+from pathlib import Path
+import time
+
+import asyncssh
+import paramiko
+from ssh_terminal_manager import (
+    AuthenticationError,
+    CommandOutput,
+    ConnectError,
+    ExecutionError,
+    HostKeyUnknownError,
+)
+from ssh_terminal_manager.terminal import (
+    CMD_START,
+    CMD_TEST,
+    ECHO_STRING,
+    EXIT_STRING,
+    ShellParser,
+)
+
+from .output import (
+    OUTPUT_CUT_CODE,
+    READ_SIZE,
+    OutputLines,
+    async_read_limited,
+    output_limit,
+)
+from .shell import ShellCommand
+from .terminal import (
+    HOST_KEY_STORE,
+    SSH_EXECUTOR,
+    SYSTEM_HOST_KEYS_FILENAME,
+    PrivateKeyStore,
+    SharedSSHTerminal,
+)
+from .transfer import TransferResult, async_download, async_upload
+
+COMPRESSION_ALGS = ["zlib@openssh.com", "zlib"]
+
+ASYNC_PRIVATE_KEY_STORE = PrivateKeyStore(asyncssh.load_keypairs)
+
+
+async def _async_detect_cmd(reader: asyncssh.SSHReader) -> bool:
+    if (await reader.readexactly(16)).decode() != CMD_START:
+        return False
+
+    line = await reader.readline()
+
+    while line.strip(b"\r\n") == b"":
+        line = await reader.readline()
+
+    return CMD_TEST in line.decode()
+
+
+async def _async_read(
+    process: asyncssh.SSHClientProcess,
+    stream: asyncssh.SSHReader,
+    limit: int | None,
+) -> tuple[bytes, bool]:
+    """Read a stream of a process and close the process at the limit."""
+    data, cut = await async_read_limited(stream.read, limit)
+
+    if cut:
+        process.close()
+
+    return data, cut
+
+
+class AsyncSSHTerminal(SharedSSHTerminal):
+    """SSH terminal that runs on the event loop.
+
+    Commands are executed on an asyncssh connection without
+    using a thread, only loading the host keys and the private
+    key from disk runs in the executor.
+    """
+
+    def __init__(self, host: str, **kwargs) -> None:
+        super().__init__(host, **kwargs)
+        self._add_host_keys = kwargs.get("add_host_keys", False)
+        self._connection: asyncssh.SSHClientConnection | None = None
+        self._shell_process: asyncssh.SSHClientProcess | None = None
+        self._shell_process_lock = asyncio.Lock()
+
+    def _known_hosts_name(self) -> str:
+        return self._host if self._port == 22 else f"[{self._host}]:{self._port}"
+
+    def _load_known_hosts(self) -> asyncssh.SSHKnownHosts:
+        self._load_host_keys()
+        filenames = [
+            filename
+            for filename in (
+                os.path.expanduser(SYSTEM_HOST_KEYS_FILENAME)
+                if self._load_system_host_keys
+                else None,
+                self._host_keys_filename,
+            )
+            if filename and Path(filename).exists()
+        ]
+        lines = []
+
+        for filename in filenames:
+            lines.extend(HOST_KEY_STORE.get_markers(filename))
+            lines.extend(
+                f"{hostname} {key.get_name()} {key.get_base64()}"
+                for hostname, keys in HOST_KEY_STORE.get(filename).items()
+                for key in keys.values()
+            )
+
+        return asyncssh.import_known_hosts("\n".join(lines) + "\n")
+
+    def _load_client_keys(self) -> Sequence[asyncssh.SSHKeyPair] | None:
+        if not self._key_filename:
+            return None
+
+        return ASYNC_PRIVATE_KEY_STORE.get(self._key_filename, self._password)
+
+    def _prepare(
+        self,
+    ) -> tuple[asyncssh.SSHKnownHosts, Sequence[asyncssh.SSHKeyPair] | None]:
+        try:
+            known_hosts = self._load_known_hosts()
+        except (OSError, ValueError) as exc:
+            raise ConnectError(f"Failed to load host keys: {exc}") from exc
+
+        try:
+            client_keys = self._load_client_keys()
+        except (asyncssh.KeyImportError, asyncssh.KeyEncryptionError, OSError) as exc:
+            raise AuthenticationError(f"Failed to load key: {exc}") from exc
+
+        return known_hosts, client_keys
+
+    def _store_host_key(self, key: asyncssh.SSHKey) -> None:
+        HOST_KEY_STORE.add(
+            self._host_keys_filename,
+            self._known_hosts_name(),
+            paramiko.PKey.from_type_string(key.get_algorithm(), key.public_data),
+        )
+
+    async def async_connect(self) -> None:
+        known_hosts, client_keys = await SSH_EXECUTOR.async_run(self._prepare)
+        add_host_key = self._add_host_keys and not any(
+            known_hosts.match(self._host, "", self._port)[:2]
+        )
+
+        try:
+            self._connection = await asyncio.wait_for(
+                asyncssh.connect(
+                    self._host,
+                    self._port,
+                    username=self._username,
+                    password=self._password,
+                    client_keys=client_keys,
+                    known_hosts=None if add_host_key else known_hosts,
+                    compression_algs=COMPRESSION_ALGS if self._compress else "none",
+                    agent_path=None,
+                    config=None,
+                ),
+                self._ssh_timeout,
+            )
+        except asyncssh.HostKeyNotVerifiable as exc:
+            raise HostKeyUnknownError(self._host) from exc
+        except asyncssh.PermissionDenied as exc:
+            raise AuthenticationError(str(exc)) from exc
+        except TimeoutError as exc:
+            raise ConnectError("Timeout during connect") from exc
+        except OSError as exc:
+            raise ConnectError(exc.strerror) from exc
+        except Exception as exc:
+            raise ConnectError(str(exc)) from exc
+
+        if add_host_key and self._host_keys_filename:
+            await SSH_EXECUTOR.async_run(
+                self._store_host_key, self._connection.get_server_host_key()
+            )
+
+    async def async_disconnect(self) -> None:
+        self._close_shell_process()
+        if connection := self._connection:
+            self._connection = None
+            connection.close()
+            await connection.wait_closed()
+
+    async def _async_execute(self, string: str, timeout: int) -> CommandOutput:
+        if not self._connection:
+            raise ExecutionError("Not connected")
+
+        if self._invoke_shell:
+            return await self._async_execute_with_shell(string, timeout)
+
+        return await self._async_execute_without_shell(string, timeout)
+
+    async def async_load_host_keys(self) -> None:
+        """Load host keys."""
+        await SSH_EXECUTOR.async_run(self._load_host_keys)
+
+    async def async_upload(
+        self, local_path: str, remote_path: str, resume: bool = False
+    ) -> TransferResult:
+        """Upload a file over SFTP.
+
+        Raises:
+            `ExecutionError`
+
+        """
+        return await self._async_transfer(async_upload, local_path, remote_path, resume)
+
+    async def async_download(
+        self, remote_path: str, local_path: str, resume: bool = False
+    ) -> TransferResult:
+        """Download a file over SFTP.
+
+        Raises:
+            `ExecutionError`
+
+        """
+        return await self._async_transfer(
+            async_download, remote_path, local_path, resume
+        )
+
+    async def async_stream(
+        self, string: str, on_line: Callable[[str | None], None]
+    ) -> Callable[[], None]:
+        """Execute a long running command and pass each line of stdout to `on_line`.
+
+        `on_line` is called with `None` when the command exits, the
+        returned function stops the command.
+
+        Raises:
+            `ExecutionError`
+
+        """
+        if not self._connection:
+            raise ExecutionError("Not connected")
+
+        try:
+            process = await self._connection.create_process(string, errors="replace")
+        except (asyncssh.Error, OSError) as exc:
+            raise ExecutionError(f"Failed to execute command: {exc}") from exc
+
+        async def read() -> None:
+            try:
+                async for line in process.stdout:
+                    if line:
+                        on_line(line.rstrip("\n"))
+            except (asyncssh.Error, OSError):
+                pass
+            finally:
+                process.close()
+                on_line(None)
+
+        asyncio.get_running_loop().create_task(read())
+        return process.close
+
+    async def _async_transfer(self, func: Callable, *args) -> TransferResult:
+        if not self._connection:
+            raise ExecutionError("Not connected")
+
+        try:
+            async with self._connection.start_sftp_client() as sftp:
+                return await func(sftp, *args, SSH_EXECUTOR.async_run)
+        except (asyncssh.Error, OSError) as exc:
+            raise ExecutionError(f"Failed to transfer file: {exc}") from exc
+
+    async def _async_execute_without_shell(
+        self, string: str, timeout: int
+    ) -> CommandOutput:
+        """Execute a command and read its output up to the output limit.
+
+        The process is closed as soon as stdout or stderr exceed the
+        limit, so large outputs are never buffered completely. A command
+        stopped that way gets the exit code `OUTPUT_CUT_CODE` unless it
+        exited already.
+        """
+        limit = output_limit.get()
+
+        try:
+            process = await self._connection.create_process(string, encoding=None)
+        except (asyncssh.Error, OSError) as exc:
+            raise ExecutionError(f"Failed to execute command: {exc}") from exc
+
+        try:
+            async with asyncio.timeout(timeout):
+                (stdout, stdout_cut), (stderr, stderr_cut) = await asyncio.gather(
+                    _async_read(process, process.stdout, limit),
+                    _async_read(process, process.stderr, limit),
+                )
+                await process.wait_closed()
+        except TimeoutError:
+            raise
+        except (asyncssh.Error, OSError) as exc:
+            raise ExecutionError(f"Failed to read command output: {exc}") from exc
+        finally:
+            process.close()
+
+        if (code := process.returncode) is None:
+            code = OUTPUT_CUT_CODE if stdout_cut or stderr_cut else 0
+
+        return CommandOutput(
+            string, time.time(), OutputLines(stdout), OutputLines(stderr), code
+        )
+
+    def _close_shell_process(self) -> None:
+        if process := self._shell_process:
+            self._shell_process = None
+            process.close()
+
+    async def _async_execute_with_shell(
+        self, string: str, timeout: int
+    ) -> CommandOutput:
+        if self._persistent_shell:
+            async with self._shell_process_lock:
+                try:
+                    return await self._async_execute_in_shell(
+                        ShellCommand(string), timeout
+                    )
+                except (TimeoutError, ExecutionError):
+                    self._close_shell_process()
+                    raise
+
+        try:
+            process = await self._connection.create_process(
+                term_type="vt100", term_size=(4095, 24), encoding=None
+            )
+        except (asyncssh.Error, OSError) as exc:
+            raise ExecutionError(f"Failed to open channel: {exc}") from exc
+
+        try:
+            async with asyncio.timeout(timeout):
+                try:
+                    cmd = await _async_detect_cmd(process.stdout)
+                except (asyncio.IncompleteReadError, UnicodeDecodeError) as exc:
+                    raise ExecutionError(f"Failed to detect shell: {exc}") from exc
+
+                for line in (stdin := string.splitlines()):
+                    process.stdin.write(f"{line}\r".encode())
+                    if cmd:
+                        await asyncio.sleep(1.5)
+                    process.stdin.write(f"{ECHO_STRING}\r".encode())
+                process.stdin.write(f"{EXIT_STRING}\r".encode())
+
+                stdout_bytes = await process.stdout.read()
+        except (asyncssh.Error, OSError) as exc:
+            raise ExecutionError(f"Failed to read command output: {exc}") from exc
+        finally:
+            process.close()
+
+        try:
+            stdout, code = ShellParser(stdin).parse(stdout_bytes)
+        except Exception as exc:
+            raise ExecutionError(f"Failed to parse command output: {exc}") from exc
+
+        return CommandOutput(string, time.time(), stdout, [], code)
+
+    async def _async_execute_in_shell(
+        self, command: ShellCommand, timeout: int
+    ) -> CommandOutput:
+        """Execute a command in the shell that stays open between commands.
+
+        Raises:
+            `TimeoutError`
+            `ExecutionError`
+
+        """
+        async with asyncio.timeout(timeout):
+            if not self._shell_process:
+                try:
+                    self._shell_process = await self._connection.create_process(
+                        term_type="vt100", term_size=(4095, 24), encoding=None
+                    )
+                except (asyncssh.Error, OSError) as exc:
+                    raise ExecutionError(f"Failed to open channel: {exc}") from exc
+
+            process = self._shell_process
+
+            try:
+                process.stdin.write(command.input)
+                while True:
+                    if not (data := await process.stdout.read(READ_SIZE)):
+                        raise ExecutionError("Shell closed")
+                    if command.feed(data):
+                        return command.get_output()
+            except (asyncssh.Error, OSError) as exc:
+                raise ExecutionError(f"Failed to read command output: {exc}") from exc
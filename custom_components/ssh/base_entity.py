@@ -1,8 +1,10 @@
+import asyncio
 from typing import Any
 
 from ssh_terminal_manager import ActionCommand, Sensor, State
 
 from homeassistant.const import CONF_DEVICE_CLASS, CONF_ICON
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity import DeviceInfo, generate_entity_id
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import slugify
@@ -11,6 +13,8 @@ from .const import CONF_ENTITY_REGISTRY_ENABLED_DEFAULT
 from .coordinator import StateCoordinator
 from .entry_data import EntryData
 
+WRITE_DELAY = 0.3
+
 
 class BaseEntity(CoordinatorEntity):
     coordinator: StateCoordinator
@@ -108,6 +112,7 @@ class BaseSensorEntity(BaseEntity):
         sensor: Sensor,
     ) -> None:
         self._sensor = sensor
+        self._sensor_entities = entry_data.sensor_entities
         super().__init__(entry_data, sensor.attributes)
 
     @property
@@ -124,7 +129,66 @@ class BaseSensorEntity(BaseEntity):
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
         self._sensor.on_update.subscribe(self._handle_sensor_update)
+        self._sensor_entities[self.entity_id] = self
 
     async def async_will_remove_from_hass(self) -> None:
+        self._sensor_entities.pop(self.entity_id, None)
         self._sensor.on_update.unsubscribe(self._handle_sensor_update)
         await super().async_will_remove_from_hass()
+
+
+class CoalescingSensorEntity(BaseSensorEntity):
+    """Sensor entity that coalesces writes of its value.
+
+    A value is written right away, values that arrive while a write
+    is running replace the queued value and are written `WRITE_DELAY`
+    after it. A failed write is followed by the queued value, if
+    there is one. The new value is shown right away until the write
+    has completed.
+    """
+
+    _has_next_value = False
+    _next_value: Any = None
+    _writer: asyncio.Task | None = None
+
+    @property
+    def _value(self) -> Any:
+        if self._writer:
+            return self._next_value
+        return self._sensor.value
+
+    async def _async_write(self) -> None:
+        try:
+            while True:
+                self._has_next_value = False
+                try:
+                    await self.coordinator.async_set_sensor_value(
+                        self.key, self._next_value
+                    )
+                except HomeAssistantError:
+                    if not self._has_next_value:
+                        raise
+                if not self._has_next_value:
+                    break
+                await asyncio.sleep(WRITE_DELAY)
+        finally:
+            self._has_next_value = False
+            self._writer = None
+            self.async_write_ha_state()
+
+    async def async_write_value(self, value: Any) -> None:
+        """Write a value, return when it or a newer value is written."""
+        self._next_value = value
+        self._has_next_value = True
+
+        if not self._writer:
+            self._writer = self.hass.async_create_task(self._async_write())
+
+        writer = self._writer
+        self.async_write_ha_state()
+        await asyncio.shield(writer)
+
+    async def async_will_remove_from_hass(self) -> None:
+        if self._writer:
+            self._writer.cancel()
+        await super().async_will_remove_from_hass()
@@ -0,0 +1,205 @@
+"""Combined execution of set commands for the SSH integration."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+import secrets
+import time
+from typing import Any
+
+from ssh_terminal_manager import (
+    Command,
+    CommandOutput,
+    ConnectError,
+    ExecutionError,
+    Sensor,
+    SensorError,
+    SSHManager,
+)
+
+SetErrorType = ConnectError | ExecutionError | SensorError | TypeError | ValueError
+
+
+class _CommandRecorder:
+    """Stands in for the manager to get the set command of a sensor.
+
+    `Sensor.async_set` validates the value and passes the control
+    command to `async_execute_command`, which only records it.
+    """
+
+    def __init__(self) -> None:
+        self.command: Command | None = None
+        self.variables: dict | None = None
+
+    async def async_execute_command(
+        self, command: Command, variables: dict | None = None
+    ) -> None:
+        self.command = command
+        self.variables = variables
+
+
+def _can_combine(manager: SSHManager, invoke_shell: bool) -> bool:
+    return (
+        not invoke_shell
+        and manager.os_name is not None
+        and "windows" not in manager.os_name.lower()
+    )
+
+
+def _split_output(
+    output: CommandOutput, marker: str, count: int
+) -> list[tuple[list[str], list[str], int] | None]:
+    parts: list[tuple[list[str], list[str], int] | None] = [None] * count
+    stdout = iter(output.stdout)
+    stderr = iter(output.stderr)
+
+    for i in range(count):
+        lines = []
+        for line in stdout:
+            if line.startswith(f"{marker}{i} "):
+                code = int(line.split()[1])
+                break
+            lines.append(line)
+        else:
+            break
+
+        error_lines = []
+        for line in stderr:
+            if line == f"{marker}{i}":
+                break
+            error_lines.append(line)
+
+        parts[i] = (
+            _strip_marker_newline(lines),
+            _strip_marker_newline(error_lines),
+            code,
+        )
+
+    return parts
+
+
+def _strip_marker_newline(lines: list[str]) -> list[str]:
+    """Remove the empty line of the newline printed before a marker.
+
+    Markers start with a newline, so they are on their own line even
+    if the output of the command doesn't end with one.
+    """
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+async def _async_set_combined(
+    manager: SSHManager,
+    items: list[tuple[int, Command, str]],
+    errors: list[SetErrorType | None],
+    command_timeout: int,
+) -> None:
+    marker = f"__set_{secrets.token_hex(4)}_"
+    script = "\n".join(
+        f"{string}\n"
+        f"printf '\\n%s%d %s\\n' {marker} {i} $?\n"
+        f"printf '\\n%s%d\\n' {marker} {i} >&2"
+        for i, (_, _, string) in enumerate(items)
+    )
+    timeout = sum(command.timeout or command_timeout for _, command, _ in items)
+
+    try:
+        output = await manager.async_execute(script, timeout)
+    except (ConnectError, ExecutionError) as exc:
+        manager.log(f"{script} => {exc}")
+        for index, command, _ in items:
+            command.handle_error(manager, exc)
+            errors[index] = exc
+        return
+
+    manager.log(f"{script} => {output.stdout}, {output.stderr}, {output.code}")
+    parts = _split_output(output, marker, len(items))
+
+    for (index, command, string), part in zip(items, parts, strict=True):
+        if part is None:
+            exc = ExecutionError("Combined command stopped before this command")
+            command.handle_error(manager, exc)
+            errors[index] = exc
+            continue
+        command.handle_success(
+            manager, CommandOutput(string, time.time(), part[0], part[1], part[2])
+        )
+
+
+async def async_set_sensor_values(
+    manager: SSHManager,
+    keys: Sequence[str],
+    values: Sequence[Any],
+    *,
+    command_timeout: int,
+    invoke_shell: bool,
+) -> tuple[tuple[Sensor], tuple[SetErrorType | None]]:
+    """Set the value of multiple controllable sensors with one command.
+
+    The set commands are combined into one script, the sensor
+    commands of the sensors and their linked sensors are executed
+    once afterwards. Uses `SSHManager.async_set_sensor_values` if
+    there is only one key, the device runs Windows or commands are
+    executed in an interactive shell, which would echo the script
+    line by line.
+
+    Raises:
+        `KeyError`
+
+    Returns:
+        Tuples of sensors and errors in the same order as `keys`.
+
+    """
+    if len(keys) < 2 or not _can_combine(manager, invoke_shell):
+        return await manager.async_set_sensor_values(keys, values, raise_errors=False)
+
+    async with manager.lock:
+        sensors, poll_errors = await manager.async_poll_sensors(
+            keys, raise_errors=False
+        )
+        errors: list[SetErrorType | None] = [*poll_errors]
+        values = [*values]
+        items: list[tuple[int, Command, str]] = []
+        linked_keys: set[str] = set()
+
+        for i, sensor in enumerate(sensors):
+            if errors[i]:
+                continue
+            recorder = _CommandRecorder()
+            try:
+                values[i] = await sensor.async_set(recorder, values[i])
+                if not (command := recorder.command):
+                    continue
+                string = await command.async_render_string(manager, recorder.variables)
+            except (
+                SensorError,
+                TypeError,
+                ValueError,
+                ConnectError,
+                ExecutionError,
+            ) as exc:
+                errors[i] = exc
+                continue
+            items.append((i, command, string))
+            linked_keys.update(command.linked_sensors)
+
+        if items:
+            await _async_set_combined(manager, items, errors, command_timeout)
+
+        poll_keys = [
+            *keys,
+            *(key for key in linked_keys if key in manager.sensors_by_key),
+        ]
+        _, poll_errors = await manager.async_poll_sensors(poll_keys, raise_errors=False)
+
+    for i, sensor in enumerate(sensors):
+        if errors[i]:
+            continue
+        if exc := poll_errors[i]:
+            errors[i] = exc
+            continue
+        if values[i] != sensor.value:
+            errors[i] = SensorError(sensor.key, "Value not set correctly")
+
+    return sensors, tuple(errors)
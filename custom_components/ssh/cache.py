@@ -0,0 +1,73 @@
+"""Cached sensor commands of the SSH integration."""
+
+from __future__ import annotations
+
+from dataclasses import KW_ONLY, dataclass
+import hashlib
+
+from ssh_terminal_manager import SSHManager
+
+from .compress import CompressedCommand
+from .table import TableCommand
+
+CACHE_DIRECTORY = "${XDG_CACHE_HOME:-${HOME:-/tmp}/.cache}/ha-ssh"
+
+
+def get_cache_string(string: str, ttl: int) -> str:
+    """Get a script that caches the output of a command on the device.
+
+    The output is written to a file in a cache directory of the user
+    that only the user can access, together with the time it was
+    written. While the file is younger than `ttl` seconds, it is
+    printed instead of executing the command. Files and directories
+    that belong to other users are never used, the script fails if
+    the directory isn't owned by the user. Output of failed
+    executions isn't cached, stderr is never cached.
+    """
+    key = hashlib.sha1(string.encode(), usedforsecurity=False).hexdigest()[:16]
+    return "\n".join(
+        [
+            "( umask 077",
+            f'd="{CACHE_DIRECTORY}"',
+            f'f="$d/{key}"',
+            "n=$(date +%s)",
+            'if [ -O "$f" ] && read t 2>/dev/null < "$f" &&',
+            f"[ $((n - t)) -lt {ttl} ]; then",
+            'tail -n +2 "$f"; exit 0; fi',
+            'mkdir -p -m 700 "$d" 2>/dev/null',
+            '[ -O "$d" ] || { echo "$d not owned by user" >&2; exit 1; }',
+            'c="$f.$$"',
+            '{ echo "$n"; (',
+            string,
+            '); } > "$c"; r=$?',
+            'tail -n +2 "$c"',
+            'if [ "$r" -eq 0 ]; then mv -f "$c" "$f"; else rm -f "$c"; fi',
+            'exit "$r" )',
+        ]
+    )
+
+
+@dataclass
+class CachedCommand(TableCommand):
+    """Sensor command whose output is cached on the device.
+
+    Executions within `cache` seconds of the last successful
+    execution return the cached output, also when Home Assistant
+    restarts in between.
+    """
+
+    _: KW_ONLY
+    cache: int = 0
+
+    async def async_render_string(
+        self,
+        manager: SSHManager,
+        variables: dict | None = None,
+    ) -> str:
+        string = await super().async_render_string(manager, variables)
+        return get_cache_string(string, self.cache)
+
+
+@dataclass
+class CachedCompressedCommand(CompressedCommand, CachedCommand):
+    """Sensor command whose output is cached and compressed on the device."""
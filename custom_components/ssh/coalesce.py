@@ -0,0 +1,111 @@
+"""Request coalescing of the SSH integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Sequence
+from contextlib import suppress
+import json
+import time
+from typing import TypeVar
+
+from ssh_terminal_manager import (
+    CommandOutput,
+    ConnectError,
+    ExecutionError,
+    Sensor,
+    SensorCommand,
+    SSHManager,
+)
+
+_T = TypeVar("_T")
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+class RequestCoalescer:
+    """Joins identical requests of a manager while they are in flight.
+
+    Callers of a request that is already running await the same
+    execution and share its result, sensor commands with an output
+    younger than `freshness` seconds are not executed at all.
+    """
+
+    def __init__(self, manager: SSHManager, freshness: int = 0) -> None:
+        self._manager = manager
+        self._freshness = freshness
+        self._requests: dict[Hashable, asyncio.Future] = {}
+
+    def _is_fresh(self, command: SensorCommand) -> bool:
+        return bool(
+            self._freshness
+            and command.output
+            and not command.error
+            and time.time() - command.output.timestamp < self._freshness
+        )
+
+    async def async_run(
+        self, key: Hashable, factory: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Run a request or join the running request with the same key."""
+        if (future := self._requests.get(key)) is None:
+            future = self._requests[key] = asyncio.ensure_future(factory())
+            future.add_done_callback(_retrieve_exception)
+            future.add_done_callback(lambda _: self._requests.pop(key, None))
+
+        return await asyncio.shield(future)
+
+    async def _async_execute_sensor_command(self, command: SensorCommand) -> None:
+        with suppress(ConnectError, ExecutionError):
+            await self._manager.async_execute_command(command)
+
+    async def async_poll_sensors(
+        self, keys: Sequence[str]
+    ) -> tuple[tuple[Sensor], tuple[ConnectError | ExecutionError | None]]:
+        """Poll multiple sensors.
+
+        Raises:
+            `KeyError`
+
+        Returns:
+            Tuples of sensors and errors in the same order as `keys`.
+
+        """
+        sensors = tuple(self._manager.get_sensor(key) for key in keys)
+        commands = tuple(self._manager.get_sensor_command(key) for key in keys)
+
+        await asyncio.gather(
+            *(
+                self.async_run(
+                    ("poll", id(command)),
+                    lambda command=command: self._async_execute_sensor_command(command),
+                )
+                for command in {id(command): command for command in commands}.values()
+                if not self._is_fresh(command)
+            )
+        )
+
+        return sensors, tuple(command.error for command in commands)
+
+    async def async_run_action(
+        self, key: str, variables: dict | None = None
+    ) -> CommandOutput:
+        """Run an action.
+
+        Raises:
+            `KeyError`
+            `ConnectError`
+            `ExecutionError`
+
+        """
+        request_key = (
+            "action",
+            key,
+            json.dumps(variables or {}, sort_keys=True, default=str),
+        )
+        return await self.async_run(
+            request_key, lambda: self._manager.async_run_action(key, variables)
+        )
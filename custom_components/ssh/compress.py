@@ -0,0 +1,136 @@
+"""Compressed sensor commands of the SSH integration."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, replace
+import time
+import zlib
+
+from ssh_terminal_manager import (
+    CommandOutput,
+    ExecutionError,
+    SensorCommand,
+    SSHManager,
+)
+
+from .output import OutputLines, get_size, limit_output
+from .table import TableCommand
+
+
+class CompressionStats:
+    """Sizes and decode times of compressed outputs."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.received = 0
+        self.decoded = 0
+        self.decode_time = 0.0
+
+    @property
+    def savings(self) -> float | None:
+        """Percentage of bytes that weren't transferred."""
+        if not self.decoded:
+            return None
+        return 100 * (1 - self.received / self.decoded)
+
+    def add(self, received: int, decoded: int, decode_time: float) -> None:
+        """Add a decoded output."""
+        self.count += 1
+        self.received += received
+        self.decoded += decoded
+        self.decode_time += decode_time
+
+
+def get_compression_stats(commands: Iterable[SensorCommand]) -> CompressionStats:
+    """Get the combined stats of the compressed commands."""
+    stats = CompressionStats()
+
+    for command in commands:
+        if isinstance(command, CompressedCommand):
+            stats.count += command.stats.count
+            stats.received += command.stats.received
+            stats.decoded += command.stats.decoded
+            stats.decode_time += command.stats.decode_time
+
+    return stats
+
+
+def decode_output(stdout: Sequence[str]) -> tuple[bytes, int]:
+    """Decode the base64 encoded gzip output of `CompressedCommand`.
+
+    Returns:
+        Output of the command and its exit code.
+
+    Raises:
+        `ValueError`
+
+    """
+    encoded = stdout.tobytes() if isinstance(stdout, OutputLines) else "".join(stdout)
+
+    try:
+        data = zlib.decompress(base64.b64decode(encoded), 16 + zlib.MAX_WBITS)
+    except (binascii.Error, zlib.error) as exc:
+        raise ValueError(exc) from exc
+
+    body, _, code = data.rstrip(b"\n").rpartition(b"\n")
+    return body, int(code)
+
+
+@dataclass
+class CompressedCommand(TableCommand):
+    """Sensor command whose output is compressed on the device.
+
+    The output is compressed with `gzip` and encoded with `base64`,
+    it is decoded before the sensors are updated. The command runs
+    in a subshell, its exit code is appended to the compressed output.
+    """
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.stats = CompressionStats()
+
+    async def async_render_string(
+        self,
+        manager: SSHManager,
+        variables: dict | None = None,
+    ) -> str:
+        string = await super().async_render_string(manager, variables)
+        return "\n".join(
+            [
+                "{ (",
+                string,
+                ")",
+                "printf '\\n%s\\n' \"$?\"",
+                "} | gzip -c | base64",
+            ]
+        )
+
+    def handle_success(self, manager: SSHManager, output: CommandOutput) -> None:
+        """Handle success, decode the output and update sensors."""
+        if output.code:
+            self.handle_error(
+                manager,
+                ExecutionError(
+                    f"Failed to compress output: {' '.join(output.stderr)}".strip()
+                ),
+            )
+            return
+
+        start = time.perf_counter()
+
+        try:
+            data, code = decode_output(output.stdout)
+        except ValueError as exc:
+            self.handle_error(
+                manager, ExecutionError(f"Failed to decode output: {exc}")
+            )
+            return
+
+        self.stats.add(get_size(output.stdout), len(data), time.perf_counter() - start)
+        super().handle_success(
+            manager,
+            limit_output(replace(output, stdout=OutputLines(data), code=code)),
+        )
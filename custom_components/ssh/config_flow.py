@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Mapping
 import logging
 import re
@@ -23,7 +24,6 @@ from ssh_terminal_manager import (
     OfflineError,
     SensorError,
     SSHManager,
-    SSHTerminal,
     default_collections,
 )
 import voluptuous as vol
@@ -74,7 +74,7 @@ from homeassistant.const import (
     CONF_VALUE_TEMPLATE,
 )
 from homeassistant.core import callback
-from homeassistant.data_entry_flow import FlowResult
+from homeassistant.data_entry_flow import FlowResult, FlowResultType
 from homeassistant.helpers.device_registry import format_mac
 from homeassistant.helpers.selector import (
     BooleanSelector,
@@ -90,21 +90,29 @@ from .const import (
     CONF_ACTION_COMMANDS,
     CONF_ADD_HOST_KEYS,
     CONF_ALLOW_TURN_OFF,
+    CONF_BACKEND,
+    CONF_CACHE,
     CONF_COMMAND_SET,
     CONF_COMMAND_TIMEOUT,
+    CONF_COMPRESS,
     CONF_DEFAULT_COMMANDS,
     CONF_DISCONNECT_MODE,
     CONF_DYNAMIC,
     CONF_ENTITY_REGISTRY_ENABLED_DEFAULT,
     CONF_FLOAT,
+    CONF_FOLLOW,
     CONF_HOST_KEYS_FILENAME,
+    CONF_INVENTORY_FILENAME,
     CONF_INVOKE_SHELL,
     CONF_KEY,
     CONF_KEY_FILENAME,
     CONF_LATEST,
     CONF_LOAD_SYSTEM_HOST_KEYS,
+    CONF_MAX_PARALLEL,
     CONF_OPTIONS,
     CONF_PATTERN,
+    CONF_PERSISTENT_SHELL,
+    CONF_POLL_FRESHNESS,
     CONF_POWER_BUTTON,
     CONF_REMOVE_CUSTOM_COMMANDS,
     CONF_RESET_COMMANDS,
@@ -112,18 +120,32 @@ from .const import (
     CONF_SENSOR_COMMANDS,
     CONF_SENSORS,
     CONF_SEPARATOR,
+    CONF_SHARE_LATEST,
+    CONF_SNAPSHOT,
     CONF_SUGGESTED_DISPLAY_PRECISION,
     CONF_SUGGESTED_UNIT_OF_MEASUREMENT,
     CONF_TIMEOUT_OFF,
     CONF_TIMEOUT_ON,
     CONF_TIMEOUT_SET,
     CONF_UPDATE_INTERVAL,
+    CONF_WATCH,
     DEFAULT_HOST_KEYS_FILENAME,
+    DEFAULT_MAX_PARALLEL,
+    DEFAULT_PERSISTENT_SHELL,
+    DEFAULT_POLL_FRESHNESS,
     DEFAULT_POWER_BUTTON,
+    DEFAULT_SHARE_LATEST,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_BACKEND,
+    DEFAULT_COMPRESS,
     DOMAIN,
 )
+from .async_terminal import AsyncSSHTerminal
 from .converter import Converter
+from .inventory import load_inventory
+from .probe import DETECT_COMMAND, PROBE_ALIASES, PROBE_COMMANDS, get_probe_key
+from .snapshot import linux_snapshot
+from .terminal import SharedSSHTerminal
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -143,11 +165,33 @@ def _sort_sensor_command(data: dict) -> dict:
             if key != CONF_SENSORS
             else [_sort_sensor(sensor) for sensor in data[key]]
         )
-        for key in [str(key) for key in SENSOR_COMMAND_SCHEMA.schema]
+        for key in [str(key) for key in _get_sensor_command_schema(data).schema]
         if key in data
     }
 
 
+def _get_sensor_command_schema(data: dict) -> vol.Schema:
+    if CONF_FOLLOW in data:
+        return TAIL_SENSOR_COMMAND_SCHEMA
+    return SENSOR_COMMAND_SCHEMA
+
+
+def _validate_sensor_command(data: dict) -> dict:
+    for option in (CONF_FOLLOW, CONF_SNAPSHOT):
+        for other in (CONF_CACHE, CONF_COMPRESS):
+            if data.get(option) and data.get(other):
+                raise vol.Invalid(f"'{other}' can't be used with '{option}'")
+
+    data = _get_sensor_command_schema(data)(data)
+
+    if CONF_CACHE in data and any(
+        CONF_COMMAND_SET in sensor for sensor in data[CONF_SENSORS]
+    ):
+        raise vol.Invalid(f"'{CONF_CACHE}' can't be used with '{CONF_COMMAND_SET}'")
+
+    return data
+
+
 def _sort_sensor(data: dict) -> dict:
     return {
         key: data[key]
@@ -205,20 +249,40 @@ class ListSelector(ObjectSelector):
         return [self._schema(element) for element in data]
 
 
+COLLECTIONS: dict[str, Collection] = {
+    **{
+        key: value
+        for key, value in default_collections.__dict__.items()
+        if isinstance(value, Collection)
+    },
+    "linux_snapshot": linux_snapshot,
+}
+
 DEFAULT_COMMANDS_SELECTOR = SelectSelector(
     SelectSelectorConfig(
         mode=SelectSelectorMode.DROPDOWN,
         options=[
             *[
                 SelectOptionDict(value=key, label=value.name)
-                for key, value in default_collections.__dict__.items()
-                if isinstance(value, Collection)
+                for key, value in COLLECTIONS.items()
             ],
+            SelectOptionDict(value="auto", label="Auto detect"),
             SelectOptionDict(value="none", label="None"),
         ],
     )
 )
 
+BACKEND_SELECTOR = SelectSelector(
+    SelectSelectorConfig(
+        mode=SelectSelectorMode.DROPDOWN,
+        options=[
+            SelectOptionDict(value="thread", label="Thread"),
+            SelectOptionDict(value="process", label="Worker process"),
+            SelectOptionDict(value="asyncio", label="Asyncio"),
+        ],
+    )
+)
+
 COMMAND_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_COMMAND): str,
@@ -239,11 +303,26 @@ ACTION_COMMAND_SCHEMA = COMMAND_SCHEMA.extend(
 SENSOR_COMMAND_SCHEMA = COMMAND_SCHEMA.extend(
     {
         vol.Optional(CONF_SCAN_INTERVAL): int,
+        vol.Optional(CONF_WATCH): [str],
+        vol.Optional(CONF_COMPRESS): bool,
+        vol.Optional(CONF_CACHE): vol.All(int, vol.Range(min=1)),
+        vol.Optional(CONF_SNAPSHOT): bool,
         vol.Optional(CONF_SEPARATOR): str,
         vol.Required(CONF_SENSORS): vol.Schema([_validate_sensor]),
     }
 )
 
+TAIL_SENSOR_COMMAND_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_FOLLOW): str,
+        vol.Optional(CONF_PATTERN): str,
+        vol.Optional(CONF_TIMEOUT): int,
+        vol.Optional(CONF_SCAN_INTERVAL): int,
+        vol.Optional(CONF_WATCH): [str],
+        vol.Required(CONF_SENSORS): vol.Schema([_validate_sensor]),
+    }
+)
+
 SENSOR_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_TYPE): vol.Any("text", "number", "binary", "version", "none"),
@@ -331,6 +410,27 @@ CONFIG_FLOW_USER_SCHEMA = vol.Schema(
         vol.Required(CONF_ADD_HOST_KEYS): BooleanSelector(),
         vol.Required(CONF_LOAD_SYSTEM_HOST_KEYS): BooleanSelector(),
         vol.Required(CONF_INVOKE_SHELL): BooleanSelector(),
+        vol.Required(CONF_PERSISTENT_SHELL): BooleanSelector(),
+        vol.Required(CONF_BACKEND): BACKEND_SELECTOR,
+        vol.Required(CONF_COMPRESS): BooleanSelector(),
+    }
+)
+
+CONFIG_FLOW_INVENTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_INVENTORY_FILENAME): str,
+        vol.Required(CONF_MAX_PARALLEL): int,
+        vol.Optional(CONF_USERNAME): str,
+        vol.Optional(CONF_PASSWORD): str,
+        vol.Required(CONF_DEFAULT_COMMANDS): DEFAULT_COMMANDS_SELECTOR,
+        vol.Optional(CONF_KEY_FILENAME): str,
+        vol.Optional(CONF_HOST_KEYS_FILENAME): str,
+        vol.Required(CONF_ADD_HOST_KEYS): BooleanSelector(),
+        vol.Required(CONF_LOAD_SYSTEM_HOST_KEYS): BooleanSelector(),
+        vol.Required(CONF_INVOKE_SHELL): BooleanSelector(),
+        vol.Required(CONF_PERSISTENT_SHELL): BooleanSelector(),
+        vol.Required(CONF_BACKEND): BACKEND_SELECTOR,
+        vol.Required(CONF_COMPRESS): BooleanSelector(),
     }
 )
 
@@ -353,8 +453,10 @@ OPTIONS_FLOW_INIT_SCHEMA = vol.Schema(
         vol.Required(CONF_DISCONNECT_MODE): BooleanSelector(),
         vol.Required(CONF_UPDATE_INTERVAL): int,
         vol.Required(CONF_COMMAND_TIMEOUT): int,
+        vol.Required(CONF_POLL_FRESHNESS): int,
+        vol.Required(CONF_SHARE_LATEST): vol.All(int, vol.Range(min=0)),
         vol.Required(CONF_ACTION_COMMANDS): ListSelector(ACTION_COMMAND_SCHEMA),
-        vol.Required(CONF_SENSOR_COMMANDS): ListSelector(SENSOR_COMMAND_SCHEMA),
+        vol.Required(CONF_SENSOR_COMMANDS): ListSelector(_validate_sensor_command),
         vol.Required(CONF_RESET_COMMANDS): BooleanSelector(),
     }
 )
@@ -380,7 +482,7 @@ class OptionsFlow(config_entries.OptionsFlow):
     @property
     def _default_collection(self) -> Collection | None:
         if (key := self.config_entry.data[CONF_DEFAULT_COMMANDS]) != "none":
-            return getattr(default_collections, key)
+            return COLLECTIONS[key]
         return None
 
     def validate_init(self, options: dict) -> dict[str, Any]:
@@ -548,7 +650,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for SSH."""
 
     VERSION = 2
-    MINOR_VERSION = 2
+    MINOR_VERSION = 7
     logger = _LOGGER
     domain = DOMAIN
     _existing_entry: ConfigEntry | None = None
@@ -590,8 +692,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return None
 
-    def get_options(self, manager: SSHManager) -> dict:
-        """Get options from manager."""
+    def get_options(self, collection: Collection) -> dict:
+        """Get options from collection."""
         converter = Converter(self.hass)
         return {
             CONF_ALLOW_TURN_OFF: DEFAULT_ALLOW_TURN_OFF,
@@ -599,19 +701,58 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             CONF_DISCONNECT_MODE: DEFAULT_DISCONNECT_MODE,
             CONF_UPDATE_INTERVAL: DEFAULT_UPDATE_INTERVAL,
             CONF_COMMAND_TIMEOUT: DEFAULT_COMMAND_TIMEOUT,
+            CONF_POLL_FRESHNESS: DEFAULT_POLL_FRESHNESS,
+            CONF_SHARE_LATEST: DEFAULT_SHARE_LATEST,
             CONF_ACTION_COMMANDS: [
                 converter.get_action_command_config(command)
-                for command in manager.action_commands
+                for command in collection.action_commands
             ],
             CONF_SENSOR_COMMANDS: [
                 converter.get_sensor_command_config(command)
-                for command in manager.sensor_commands
+                for command in collection.sensor_commands
             ],
         }
 
+    async def async_probe(self, manager: SSHManager, key: str) -> str:
+        """Execute the probe command of a collection and return its key.
+
+        With `auto`, a command that runs in every supported shell detects
+        the shell first and only its probe command is executed. The key
+        is `none` if that doesn't report the OS name.
+        """
+        if key == "none":
+            await manager.async_update()
+            return key
+
+        if key == "auto":
+            await manager.async_update()
+            probe_key = get_probe_key(await manager.async_execute(DETECT_COMMAND))
+        else:
+            probe_key = key
+
+        manager.set_sensor_commands(
+            [PROBE_COMMANDS[PROBE_ALIASES.get(probe_key, probe_key)]]
+        )
+        await manager.async_update(force=True)
+
+        if key == "auto" and not manager.os_name:
+            return "none"
+
+        self.logger.debug("Detected collection: %s", probe_key)
+        return probe_key
+
     async def async_validate_user(self, data: dict) -> tuple[dict, dict]:
-        """Validate the config user input."""
-        terminal = SSHTerminal(
+        """Validate the config user input with the terminal of the backend.
+
+        The process backend is validated with the thread terminal, which
+        it runs in the worker process.
+        """
+        terminal_cls = (
+            AsyncSSHTerminal
+            if data.get(CONF_BACKEND) == "asyncio"
+            else SharedSSHTerminal
+        )
+        terminal = terminal_cls(
             data[CONF_HOST],
             port=data[CONF_PORT],
             username=data.get(CONF_USERNAME),
@@ -621,29 +762,26 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             add_host_keys=data[CONF_ADD_HOST_KEYS],
             load_system_host_keys=data[CONF_LOAD_SYSTEM_HOST_KEYS],
             invoke_shell=data[CONF_INVOKE_SHELL],
+            persistent_shell=data[CONF_PERSISTENT_SHELL],
+            compress=data[CONF_COMPRESS],
         )
 
-        manager = SSHManager(
-            terminal,
-            collection=(
-                getattr(default_collections, key)
-                if (key := data[CONF_DEFAULT_COMMANDS]) != "none"
-                else None
-            ),
-            logger=self.logger,
-        )
+        manager = SSHManager(terminal, logger=self.logger)
 
         await manager.async_load_host_keys()
 
         async with manager:
-            await manager.async_update()
+            key = await self.async_probe(manager, data[CONF_DEFAULT_COMMANDS])
 
         data = {
             **data,
+            CONF_DEFAULT_COMMANDS: key,
             CONF_MAC: self.get_mac_address(manager),
             CONF_NAME: await self.async_get_hostname(manager),
         }
-        options = self.get_options(manager)
+        options = self.get_options(
+            COLLECTIONS[key] if key != "none" else Collection("")
+        )
 
         return data, options
 
@@ -696,6 +834,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
+        if user_input is None and self.source == config_entries.SOURCE_USER:
+            return self.async_show_menu(
+                step_id="user",
+                menu_options=["host", "inventory"],
+            )
+
         errors: dict[str, str] = {}
         placeholders: dict[str, str] = {}
         if user_input is not None:
@@ -725,6 +869,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 return await self.async_handle_step_user_success()
 
+        return self.async_show_user_form(errors, placeholders)
+
+    def async_show_user_form(
+        self, errors: dict[str, str], placeholders: dict[str, str]
+    ) -> FlowResult:
+        """Show the user form."""
         return self.async_show_form(
             step_id="user",
             errors=errors,
@@ -747,10 +897,167 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_INVOKE_SHELL: self._data.get(
                         CONF_INVOKE_SHELL, DEFAULT_INVOKE_SHELL
                     ),
+                    CONF_PERSISTENT_SHELL: self._data.get(
+                        CONF_PERSISTENT_SHELL, DEFAULT_PERSISTENT_SHELL
+                    ),
+                    CONF_BACKEND: self._data.get(CONF_BACKEND, DEFAULT_BACKEND),
+                    CONF_COMPRESS: self._data.get(CONF_COMPRESS, DEFAULT_COMPRESS),
                 },
             ),
         )
 
+    async def async_step_host(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle the host step."""
+        return self.async_show_user_form({}, {})
+
+    async def async_validate_inventory_host(
+        self, defaults: dict, host_config: dict
+    ) -> tuple[dict, dict]:
+        """Validate a host of the inventory."""
+        data, options = await self.async_validate_user(
+            {CONF_PORT: DEFAULT_PORT, **defaults, **host_config}
+        )
+        data = {
+            **data,
+            CONF_MAC: host_config.get(CONF_MAC, data[CONF_MAC]),
+            CONF_NAME: host_config.get(CONF_NAME, data[CONF_NAME] or data[CONF_HOST]),
+        }
+
+        if not data[CONF_MAC]:
+            raise MACAddressInvalidError("MAC address not detected")
+
+        data[CONF_MAC] = self.validate_mac_address(data[CONF_MAC])
+        data[CONF_NAME] = await self.async_validate_name(data[CONF_NAME])
+        return data, options
+
+    async def async_import_inventory(self, host_configs: list[dict]) -> FlowResult:
+        """Validate the hosts of the inventory in parallel and import them."""
+        defaults = {
+            key: value
+            for key, value in self._data.items()
+            if key not in (CONF_INVENTORY_FILENAME, CONF_MAX_PARALLEL)
+        }
+        semaphore = asyncio.Semaphore(max(self._data[CONF_MAX_PARALLEL], 1))
+
+        async def async_validate(host_config: dict) -> tuple[dict, dict]:
+            async with semaphore:
+                return await self.async_validate_inventory_host(defaults, host_config)
+
+        results = await asyncio.gather(
+            *(async_validate(host_config) for host_config in host_configs),
+            return_exceptions=True,
+        )
+        failures: list[str] = []
+        imports: list[tuple[dict, dict]] = []
+        names: set[str] = set()
+
+        for host_config, result in zip(host_configs, results, strict=True):
+            if isinstance(result, Exception):
+                failures.append(f"{host_config[CONF_HOST]}: {result}")
+                continue
+            data, options = result
+            if (name := slugify(data[CONF_NAME])) in names:
+                failures.append(f"{data[CONF_HOST]}: Name {name} exists already")
+                continue
+            names.add(name)
+            imports.append((data, options))
+
+        flow_results = await asyncio.gather(
+            *(
+                self.hass.config_entries.flow.async_init(
+                    self.domain,
+                    context={"source": config_entries.SOURCE_IMPORT},
+                    data={"data": data, "options": options},
+                )
+                for data, options in imports
+            )
+        )
+
+        for (data, _), flow_result in zip(imports, flow_results, strict=True):
+            if flow_result["type"] != FlowResultType.CREATE_ENTRY:
+                failures.append(f"{data[CONF_HOST]}: {flow_result.get('reason')}")
+
+        if failures:
+            self.logger.warning(
+                "Failed to import %s of %s hosts:\n%s",
+                len(failures),
+                len(host_configs),
+                "\n".join(failures),
+            )
+
+        return self.async_abort(
+            reason="inventory_imported",
+            description_placeholders={
+                "imported": str(len(host_configs) - len(failures)),
+                "failed": str(len(failures)),
+                "failures": "\n".join(f"- {failure}" for failure in failures),
+            },
+        )
+
+    async def async_step_inventory(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle the inventory step."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            self._data = user_input
+            try:
+                host_configs = await self.hass.async_add_executor_job(
+                    load_inventory, user_input[CONF_INVENTORY_FILENAME]
+                )
+            except (OSError, TypeError, ValueError):
+                errors["base"] = "inventory_file_error"
+            except Exception:
+                self.logger.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                return await self.async_import_inventory(host_configs)
+
+        return self.async_show_form(
+            step_id="inventory",
+            errors=errors,
+            data_schema=self.add_suggested_values_to_schema(
+                CONFIG_FLOW_INVENTORY_SCHEMA,
+                {
+                    **self._data,
+                    CONF_MAX_PARALLEL: self._data.get(
+                        CONF_MAX_PARALLEL, DEFAULT_MAX_PARALLEL
+                    ),
+                    CONF_HOST_KEYS_FILENAME: self._data.get(
+                        CONF_HOST_KEYS_FILENAME,
+                        f"{self.hass.config.config_dir}/{DEFAULT_HOST_KEYS_FILENAME}",
+                    ),
+                    CONF_ADD_HOST_KEYS: self._data.get(
+                        CONF_ADD_HOST_KEYS, DEFAULT_ADD_HOST_KEYS
+                    ),
+                    CONF_LOAD_SYSTEM_HOST_KEYS: self._data.get(
+                        CONF_LOAD_SYSTEM_HOST_KEYS, DEFAULT_LOAD_SYSTEM_HOST_KEYS
+                    ),
+                    CONF_INVOKE_SHELL: self._data.get(
+                        CONF_INVOKE_SHELL, DEFAULT_INVOKE_SHELL
+                    ),
+                    CONF_PERSISTENT_SHELL: self._data.get(
+                        CONF_PERSISTENT_SHELL, DEFAULT_PERSISTENT_SHELL
+                    ),
+                    CONF_BACKEND: self._data.get(CONF_BACKEND, DEFAULT_BACKEND),
+                    CONF_COMPRESS: self._data.get(CONF_COMPRESS, DEFAULT_COMPRESS),
+                },
+            ),
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Handle the import step."""
+        data = import_data["data"]
+        await self.async_set_unique_id(format_mac(data[CONF_MAC]))
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=data[CONF_NAME],
+            data=data,
+            options=import_data["options"],
+        )
+
     async def async_step_mac_address(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -2,35 +2,55 @@
 
 DOMAIN = "ssh"
 
+DEFAULT_BACKEND = "thread"
+DEFAULT_COMPRESS = False
 DEFAULT_HOST_KEYS_FILENAME = "known_hosts"
 DEFAULT_UPDATE_INTERVAL = 30
 DEFAULT_POWER_BUTTON = False
+DEFAULT_MAX_PARALLEL = 10
+DEFAULT_PERSISTENT_SHELL = False
+DEFAULT_POLL_FRESHNESS = 0
+DEFAULT_SHARE_LATEST = 0
 
 CONF_ACTION_COMMANDS = "action_commands"
 CONF_ADD_HOST_KEYS = "add_host_keys"
 CONF_ALLOW_TURN_OFF = "allow_turn_off"
+CONF_BACKEND = "backend"
+CONF_CACHE = "cache"
 CONF_COMMAND_SET = "command_set"
 CONF_COMMAND_TIMEOUT = "command_timeout"
+CONF_COMPRESS = "compress"
+CONF_DEADLINE = "deadline"
 CONF_DEFAULT_COMMANDS = "default_commands"
 CONF_DISCONNECT_MODE = "disconnect_mode"
 CONF_DYNAMIC = "dynamic"
 CONF_ENTITY_REGISTRY_ENABLED_DEFAULT = "entity_registry_enabled_default"
 CONF_FLOAT = "float"
+CONF_FOLLOW = "follow"
 CONF_HOST_KEYS_FILENAME = "host_keys_filename"
+CONF_INVENTORY_FILENAME = "inventory_filename"
 CONF_INVOKE_SHELL = "invoke_shell"
 CONF_KEY = "key"
 CONF_KEY_FILENAME = "key_filename"
 CONF_LATEST = "latest"
 CONF_LOAD_SYSTEM_HOST_KEYS = "load_system_host_keys"
+CONF_LOCAL_PATH = "local_path"
+CONF_MAX_PARALLEL = "max_parallel"
 CONF_OPTIONS = "options"
 CONF_PATTERN = "pattern"
+CONF_PERSISTENT_SHELL = "persistent_shell"
+CONF_POLL_FRESHNESS = "poll_freshness"
 CONF_POWER_BUTTON = "power_button"
+CONF_REMOTE_PATH = "remote_path"
 CONF_REMOVE_CUSTOM_COMMANDS = "remove_custom_commands"
 CONF_RESET_COMMANDS = "reset_commands"
 CONF_RESET_DEFAULT_COMMANDS = "reset_default_commands"
+CONF_RESUME = "resume"
 CONF_SENSORS = "sensors"
 CONF_SENSOR_COMMANDS = "sensor_commands"
 CONF_SEPARATOR = "separator"
+CONF_SHARE_LATEST = "share_latest"
+CONF_SNAPSHOT = "snapshot"
 CONF_SUGGESTED_DISPLAY_PRECISION = "suggested_display_precision"
 CONF_SUGGESTED_UNIT_OF_MEASUREMENT = "suggested_unit_of_measurement"
 CONF_TIMEOUT_OFF = "timeout_off"
@@ -38,7 +58,9 @@ CONF_TIMEOUT_ON = "timeout_on"
 CONF_TIMEOUT_SET = "timeout_set"
 CONF_UPDATE_INTERVAL = "update_interval"
 CONF_VALUES = "values"
+CONF_WATCH = "watch"
 
+SERVICE_DOWNLOAD_FILE = "download_file"
 SERVICE_EXECUTE_COMMAND = "execute_command"
 SERVICE_POLL_SENSOR = "poll_sensor"
 SERVICE_RESTART = "restart"
@@ -46,3 +68,4 @@ SERVICE_RUN_ACTION = "run_action"
 SERVICE_SET_VALUE = "set_value"
 SERVICE_TURN_OFF = "turn_off"
 SERVICE_TURN_ON = "turn_on"
+SERVICE_UPLOAD_FILE = "upload_file"
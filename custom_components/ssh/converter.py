@@ -39,10 +39,13 @@ from homeassistant.core import HomeAssistant
 
 from .const import (
     CONF_ACTION_COMMANDS,
+    CONF_CACHE,
     CONF_COMMAND_SET,
+    CONF_COMPRESS,
     CONF_DYNAMIC,
     CONF_ENTITY_REGISTRY_ENABLED_DEFAULT,
     CONF_FLOAT,
+    CONF_FOLLOW,
     CONF_KEY,
     CONF_LATEST,
     CONF_OPTIONS,
@@ -50,13 +53,26 @@ from .const import (
     CONF_SENSOR_COMMANDS,
     CONF_SENSORS,
     CONF_SEPARATOR,
+    CONF_SNAPSHOT,
     CONF_SUGGESTED_DISPLAY_PRECISION,
     CONF_SUGGESTED_UNIT_OF_MEASUREMENT,
     CONF_TIMEOUT_OFF,
     CONF_TIMEOUT_ON,
     CONF_TIMEOUT_SET,
+    CONF_WATCH,
 )
+from .cache import CachedCommand, CachedCompressedCommand
+from .compress import CompressedCommand
 from .helpers import get_command_renderer, get_value_renderer
+from .snapshot import SnapshotCommand
+from .table import (
+    TableBinarySensor,
+    TableCommand,
+    TableNumberSensor,
+    TableTextSensor,
+    TableVersionSensor,
+)
+from .tail import TailCommand
 
 ACTION_ATTR_KEYS = (
     CONF_DEVICE_CLASS,
@@ -310,10 +326,27 @@ class Converter:
 
     def get_sensor_command_config(self, command: SensorCommand) -> dict:
         """Get the sensor command config."""
+        command_config = (
+            {
+                CONF_FOLLOW: command.path,
+                CONF_PATTERN: command.pattern,
+                CONF_TIMEOUT: command.timeout,
+            }
+            if isinstance(command, TailCommand)
+            else self._get_command_config(command)
+        )
         return remove_none_items(
             {
-                **self._get_command_config(command),
+                **command_config,
                 CONF_SCAN_INTERVAL: command.interval,
+                CONF_WATCH: command.watch or None
+                if isinstance(command, (TableCommand, TailCommand))
+                else None,
+                CONF_COMPRESS: isinstance(command, CompressedCommand) or None,
+                CONF_CACHE: command.cache
+                if isinstance(command, CachedCommand)
+                else None,
+                CONF_SNAPSHOT: isinstance(command, SnapshotCommand) or None,
                 CONF_SEPARATOR: command.separator,
                 CONF_SENSORS: [
                     self._get_text_sensor_config(sensor)
@@ -332,24 +365,54 @@ class Converter:
 
     def get_sensor_command_kwargs(self, data: dict) -> dict:
         """Get the sensor command kwargs."""
+        command_kwargs = (
+            {
+                "string": f"tail {data[CONF_FOLLOW]}",
+                "timeout": data.get(CONF_TIMEOUT),
+                "path": data[CONF_FOLLOW],
+                "pattern": data.get(CONF_PATTERN),
+            }
+            if CONF_FOLLOW in data
+            else self._get_command_kwargs(data)
+        )
         return {
-            **self._get_command_kwargs(data),
+            **command_kwargs,
             "interval": data.get(CONF_SCAN_INTERVAL),
+            "watch": data.get(CONF_WATCH, []),
             "separator": data.get(CONF_SEPARATOR),
             "sensors": [
-                TextSensor(**self._get_text_sensor_kwargs(sensor_data))
+                TableTextSensor(**self._get_text_sensor_kwargs(sensor_data))
                 if sensor_data[CONF_TYPE] == "text"
-                else NumberSensor(**self._get_number_sensor_kwargs(sensor_data))
+                else TableNumberSensor(**self._get_number_sensor_kwargs(sensor_data))
                 if sensor_data[CONF_TYPE] == "number"
-                else BinarySensor(**self._get_binary_sensor_kwargs(sensor_data))
+                else TableBinarySensor(**self._get_binary_sensor_kwargs(sensor_data))
                 if sensor_data[CONF_TYPE] == "binary"
-                else VersionSensor(**self._get_version_sensor_kwargs(sensor_data))
+                else TableVersionSensor(**self._get_version_sensor_kwargs(sensor_data))
                 if sensor_data[CONF_TYPE] == "version"
                 else Sensor(key=PLACEHOLDER_KEY)
                 for sensor_data in data[CONF_SENSORS]
             ],
         }
 
+    def get_sensor_command(self, data: dict) -> SensorCommand:
+        """Get the sensor command."""
+        kwargs = self.get_sensor_command_kwargs(data)
+
+        if CONF_FOLLOW in data:
+            command = TailCommand(**kwargs)
+        elif data.get(CONF_SNAPSHOT):
+            command = SnapshotCommand(**kwargs)
+        elif cache := data.get(CONF_CACHE):
+            command = (
+                CachedCompressedCommand if data.get(CONF_COMPRESS) else CachedCommand
+            )(**kwargs, cache=cache)
+        elif data.get(CONF_COMPRESS):
+            command = CompressedCommand(**kwargs)
+        else:
+            command = TableCommand(**kwargs)
+
+        return command
+
     def get_collection(self, options: dict) -> Collection:
         """Get the collection."""
         return Collection(
@@ -359,7 +422,7 @@ class Converter:
                 for command_data in options[CONF_ACTION_COMMANDS]
             ],
             [
-                SensorCommand(**self.get_sensor_command_kwargs(command_data))
+                self.get_sensor_command(command_data)
                 for command_data in options[CONF_SENSOR_COMMANDS]
             ],
         )
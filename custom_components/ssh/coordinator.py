@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from collections.abc import Callable
-from datetime import timedelta
+from contextlib import suppress
+from datetime import datetime, timedelta
 from typing import TYPE_CHECKING, Any
 
 from ssh_terminal_manager import (
@@ -15,14 +16,25 @@ from ssh_terminal_manager import (
     SSHManager,
 )
 
-from homeassistant.core import HomeAssistant, HomeAssistantError, ServiceValidationError
+from homeassistant.core import (
+    HomeAssistant,
+    HomeAssistantError,
+    ServiceValidationError,
+    callback,
+)
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
+from .const import CONF_DISCONNECT_MODE
+from .priority import background_lane
+
 if TYPE_CHECKING:
     from .entry_data import EntryData
 
 FAST_UPDATE_INTERVAL = timedelta(seconds=1)
+DISCONNECT_MODE_DELAY = 2
+PREWARM_TIME = 2
 
 
 class BaseCoordinator(DataUpdateCoordinator):
@@ -83,7 +95,8 @@ class StateCoordinator(BaseCoordinator):
 
     async def _async_update_data(self) -> None:
         try:
-            await self._manager.async_update(once=True, test=True)
+            with background_lane():
+                await self._manager.async_update(once=True, test=True)
         except AuthenticationError as exc:
             raise ConfigEntryAuthFailed(exc) from exc
         except (OfflineError, ConnectError, ExecutionError):
@@ -146,6 +159,10 @@ class StateCoordinator(BaseCoordinator):
 
 
 class SensorCommandCoordinator(BaseCoordinator):
+    _disconnect_mode = False
+    _remove_prewarm: Callable | None = None
+    _remove_prewarm_disconnect: Callable | None = None
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -159,15 +176,101 @@ class SensorCommandCoordinator(BaseCoordinator):
             timedelta(seconds=command.interval) if command.interval else None,
         )
         self._command = command
+        self._disconnect_mode = self.config_entry.options[CONF_DISCONNECT_MODE]
 
-    async def _async_update_data(self) -> None:
-        if not self._manager.can_execute:
+    @property
+    def command(self) -> SensorCommand:
+        """The sensor command of the coordinator."""
+        return self._command
+
+    @callback
+    def set_polling(self, enabled: bool) -> None:
+        """Enable or disable updating at the interval of the command."""
+        interval = self._command.interval
+
+        if enabled and interval:
+            self.update_interval = timedelta(seconds=interval)
+            self._schedule_refresh()
+            self._schedule_prewarm()
+        else:
+            self.update_interval = None
+            self._unschedule_refresh()
+            self._cancel_prewarm()
+
+    def _schedule_prewarm(self) -> None:
+        """Schedule a connect `PREWARM_TIME` before the next update."""
+        self._cancel_prewarm()
+
+        if not (self._disconnect_mode and self.update_interval):
+            return
+
+        if (delay := self.update_interval.total_seconds() - PREWARM_TIME) > 0:
+            self._remove_prewarm = async_call_later(self.hass, delay, self._prewarm)
+
+    def _cancel_prewarm(self) -> None:
+        if self._remove_prewarm:
+            self._remove_prewarm()
+            self._remove_prewarm = None
+
+    def _cancel_prewarm_disconnect(self) -> bool:
+        """Cancel the disconnect of a prewarmed connection.
+
+        Return `True` if it was scheduled.
+        """
+        if not self._remove_prewarm_disconnect:
+            return False
+
+        self._remove_prewarm_disconnect()
+        self._remove_prewarm_disconnect = None
+        return True
+
+    async def _prewarm(self, _: datetime) -> None:
+        self._remove_prewarm = None
+
+        if not self._manager.can_connect:
             return
+
+        with suppress(ConnectError), background_lane():
+            await self._manager.async_connect()
+
+        if self._manager.state.connected:
+            self._cancel_prewarm_disconnect()
+            self._remove_prewarm_disconnect = async_call_later(
+                self.hass,
+                PREWARM_TIME + DISCONNECT_MODE_DELAY,
+                self._disconnect_prewarmed,
+            )
+
+    async def _disconnect_prewarmed(self, _: datetime | None = None) -> None:
+        """Disconnect a prewarmed connection that no update has used."""
+        self._remove_prewarm_disconnect = None
+
+        with background_lane():
+            await self._manager.async_disconnect()
+
+    async def async_shutdown(self) -> None:
+        """Cancel prewarm, stop and shutdown."""
+        self._cancel_prewarm()
+        self._cancel_prewarm_disconnect()
+        await super().async_shutdown()
+
+    async def _async_update_data(self) -> None:
+        prewarmed = self._cancel_prewarm_disconnect()
+        executed = False
+
         try:
-            await self._manager.async_execute_command(self._command)
+            if not self._manager.can_execute:
+                return
+            executed = True
+            with background_lane():
+                await self._manager.async_execute_command(self._command)
         except AuthenticationError as exc:
             raise ConfigEntryAuthFailed(exc) from exc
         except (ConnectError, ExecutionError):
             pass
         except Exception as exc:
             raise UpdateFailed(f"Exception updating {self.name}: {exc}") from exc
+        finally:
+            if prewarmed and not executed:
+                await self._disconnect_prewarmed()
+            self._schedule_prewarm()
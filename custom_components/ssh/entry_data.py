@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
 from ssh_terminal_manager import ActionKey, SensorKey, SSHManager
 
@@ -6,8 +9,13 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.helpers.device_registry import DeviceEntry
 
+from .coalesce import RequestCoalescer
 from .coordinator import BaseCoordinator, SensorCommandCoordinator, StateCoordinator
 
+if TYPE_CHECKING:
+    from .base_entity import BaseSensorEntity
+    from .terminal import BaseSharedTerminal
+
 
 @dataclass
 class EntryData:
@@ -15,10 +23,13 @@ class EntryData:
     manager: SSHManager
     state_coordinator: StateCoordinator
     command_coordinators: list[SensorCommandCoordinator]
+    coalescer: RequestCoalescer
     platforms: list[Platform]
     ignored_action_keys: list[ActionKey] | None = None
     ignored_sensor_keys: list[SensorKey] | None = None
+    terminal: BaseSharedTerminal | None = None
     device_entry: DeviceEntry | None = None
+    sensor_entities: dict[str, BaseSensorEntity] = field(default_factory=dict)
 
     @property
     def coordinators(self) -> list[BaseCoordinator]:
@@ -0,0 +1,152 @@
+"""Fleet-wide command execution of the SSH integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Mapping, Sequence
+import logging
+from typing import Any
+
+from ssh_terminal_manager import Command, CommandOutput
+
+from homeassistant.const import CONF_COMMAND, CONF_TIMEOUT, CONF_VARIABLES
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_DEADLINE, CONF_MAX_PARALLEL, DEFAULT_MAX_PARALLEL, DOMAIN
+from .entry_data import EntryData
+from .helpers import get_command_renderer
+from .output import SPOOL_THRESHOLD, get_size, spool_lines, unlimited_output
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def _async_get_lines_result(
+    hass: HomeAssistant, entry_data: EntryData, name: str, lines: Sequence[str]
+) -> dict:
+    if get_size(lines) <= SPOOL_THRESHOLD:
+        return {name: list(lines)}
+
+    try:
+        spooled = await hass.async_add_executor_job(
+            spool_lines,
+            hass.config.path(DOMAIN, "output"),
+            f"{entry_data.device_entry.id}_{name}",
+            lines,
+        )
+    except OSError as exc:
+        _LOGGER.warning("Failed to write %s to file: %s", name, exc)
+        return {name: list(lines)}
+
+    return {
+        name: spooled["preview"],
+        f"{name}_file": spooled["path"],
+        f"{name}_size": spooled["size"],
+    }
+
+
+async def async_get_command_result(
+    hass: HomeAssistant,
+    entry_data: EntryData,
+    output: CommandOutput | None = None,
+    exc: Exception | None = None,
+) -> dict:
+    """Get the service result of a command.
+
+    Stdout and stderr that are larger than `SPOOL_THRESHOLD` are
+    written to files, the result only contains their path, size
+    and the first lines.
+    """
+    if output is None:
+        return {
+            "device_id": entry_data.device_entry.id,
+            "device_name": entry_data.device_entry.name,
+            "success": False,
+            "error": str(exc),
+        }
+
+    return {
+        "device_id": entry_data.device_entry.id,
+        "device_name": entry_data.device_entry.name,
+        "success": True,
+        "command": output.command_string,
+        **await _async_get_lines_result(hass, entry_data, "stdout", output.stdout),
+        **await _async_get_lines_result(hass, entry_data, "stderr", output.stderr),
+        "code": output.code,
+    }
+
+
+async def async_execute_command(
+    hass: HomeAssistant,
+    entry_data: EntryData,
+    data: Mapping[str, Any],
+    semaphore: asyncio.Semaphore,
+) -> dict:
+    """Execute a command on one device and return its service result.
+
+    The deadline starts when a slot of the semaphore is free, it
+    covers waiting for the device and the execution of the command.
+    """
+    command = Command(
+        data[CONF_COMMAND],
+        timeout=data.get(CONF_TIMEOUT),
+        renderer=get_command_renderer(hass),
+    )
+
+    try:
+        async with semaphore, asyncio.timeout(data.get(CONF_DEADLINE)):
+            with unlimited_output():
+                output = await entry_data.manager.async_execute_command(
+                    command, data.get(CONF_VARIABLES)
+                )
+    except TimeoutError:
+        return await async_get_command_result(
+            hass, entry_data, exc=TimeoutError("Deadline exceeded")
+        )
+    except Exception as exc:  # noqa: BLE001
+        return await async_get_command_result(hass, entry_data, exc=exc)
+
+    return await async_get_command_result(hass, entry_data, output)
+
+
+def _get_semaphore(data: Mapping[str, Any]) -> asyncio.Semaphore:
+    return asyncio.Semaphore(data.get(CONF_MAX_PARALLEL, DEFAULT_MAX_PARALLEL))
+
+
+async def async_execute_command_on_entries(
+    hass: HomeAssistant,
+    entries: Iterable[EntryData],
+    data: Mapping[str, Any],
+) -> list[dict]:
+    """Execute a command on multiple devices.
+
+    Returns:
+        Service results in the same order as `entries`.
+
+    """
+    semaphore = _get_semaphore(data)
+    return await asyncio.gather(
+        *(
+            async_execute_command(hass, entry_data, data, semaphore)
+            for entry_data in entries
+        )
+    )
+
+
+async def async_iter_command_results(
+    hass: HomeAssistant,
+    entries: Iterable[EntryData],
+    data: Mapping[str, Any],
+) -> AsyncIterator[dict]:
+    """Execute a command on multiple devices and yield results as they complete."""
+    semaphore = _get_semaphore(data)
+    tasks = [
+        asyncio.create_task(async_execute_command(hass, entry_data, data, semaphore))
+        for entry_data in entries
+    ]
+
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -4,9 +4,12 @@ from collections.abc import Callable
 
 from ssh_terminal_manager import Sensor, SensorKey, SSHManager
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_ENTITY_ID, ENTITY_MATCH_ALL
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.device_registry import DeviceRegistry
 from homeassistant.helpers.entity_platform import EntityPlatform
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
 from homeassistant.helpers.template import Template
 from homeassistant.util.unit_conversion import InformationConverter
 
@@ -94,6 +97,45 @@ def get_device_info(manager: SSHManager) -> dict:
     }
 
 
+def get_target_entity_ids(hass: HomeAssistant, call: ServiceCall) -> list[str] | None:
+    """Get the IDs of the entities targeted by a service call.
+
+    Entities named in `entity_id` come first in the given order,
+    entities targeted through devices or areas follow sorted by ID.
+    `None` targets all entities.
+    """
+    if call.data.get(ATTR_ENTITY_ID) == ENTITY_MATCH_ALL:
+        return None
+
+    selected = async_extract_referenced_entity_ids(hass, call)
+    entity_ids = selected.referenced | selected.indirectly_referenced
+    ordered_ids = dict.fromkeys(
+        [*cv.ensure_list(call.data.get(ATTR_ENTITY_ID)), *sorted(entity_ids)]
+    )
+
+    return [entity_id for entity_id in ordered_ids if entity_id in entity_ids]
+
+
+def get_target_sensor_entities(
+    entry_data: EntryData,
+    entity_ids: list[str] | None,
+) -> list[BaseSensorEntity]:
+    """Get the available sensor entities of an entry with the targeted IDs.
+
+    The IDs are resolved once per service call by `get_target_entity_ids`.
+    """
+    entities = entry_data.sensor_entities
+
+    if entity_ids is None:
+        return [entity for entity in entities.values() if entity.available]
+
+    return [
+        entity
+        for entity_id in entity_ids
+        if (entity := entities.get(entity_id)) and entity.available
+    ]
+
+
 def get_device_sensor_update_handler(
     hass: HomeAssistant,
     entry_data: EntryData,
@@ -0,0 +1,115 @@
+"""Inventory files for the SSH integration."""
+
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+import paramiko
+
+from homeassistant.const import (
+    CONF_HOST,
+    CONF_MAC,
+    CONF_NAME,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_USERNAME,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.yaml import load_yaml
+
+from .const import CONF_KEY_FILENAME
+
+INVENTORY_KEYS = (
+    CONF_HOST,
+    CONF_PORT,
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    CONF_KEY_FILENAME,
+    CONF_MAC,
+    CONF_NAME,
+)
+
+
+def _clean_host_config(data: dict) -> dict:
+    host_config = {
+        key: value
+        for key in INVENTORY_KEYS
+        if (value := data.get(key)) not in (None, "")
+    }
+
+    if CONF_PORT in host_config:
+        host_config[CONF_PORT] = int(host_config[CONF_PORT])
+
+    return host_config
+
+
+def _load_ssh_config(path: Path) -> list[dict]:
+    ssh_config = paramiko.SSHConfig.from_path(str(path))
+    host_configs = []
+
+    for alias in sorted(ssh_config.get_hostnames()):
+        if any(char in alias for char in "*?!"):
+            continue
+        options = ssh_config.lookup(alias)
+        host_configs.append(
+            {
+                CONF_HOST: options.get("hostname", alias),
+                CONF_PORT: options.get("port"),
+                CONF_USERNAME: options.get("user"),
+                CONF_KEY_FILENAME: next(iter(options.get("identityfile", [])), None),
+                CONF_NAME: alias,
+            }
+        )
+
+    return host_configs
+
+
+def _load_yaml(path: Path) -> list[dict]:
+    data = load_yaml(str(path))
+
+    if isinstance(data, dict):
+        data = data.get("hosts", [])
+
+    if not isinstance(data, list):
+        raise TypeError(f"Invalid inventory file: {path}")
+
+    return [
+        item if isinstance(item, dict) else {CONF_HOST: str(item)} for item in data
+    ]
+
+
+def _load_csv(path: Path) -> list[dict]:
+    with path.open(encoding="utf-8", newline="") as file:
+        return list(csv.DictReader(file))
+
+
+def load_inventory(filename: str) -> list[dict]:
+    """Load the host configs from an inventory file.
+
+    Supported formats are YAML (`.yaml`, `.yml`), CSV (`.csv`)
+    and OpenSSH client configuration (any other file name).
+
+    Raises:
+        `OSError`
+        `TypeError`
+        `ValueError`
+
+    """
+    path = Path(filename)
+
+    try:
+        if path.suffix in (".yaml", ".yml"):
+            host_configs = _load_yaml(path)
+        elif path.suffix == ".csv":
+            host_configs = _load_csv(path)
+        else:
+            host_configs = _load_ssh_config(path)
+    except (HomeAssistantError, paramiko.SSHException) as exc:
+        raise ValueError(f"Invalid inventory file: {exc}") from exc
+
+    return [
+        host_config
+        for data in host_configs
+        if CONF_HOST in (host_config := _clean_host_config(data))
+    ]
@@ -0,0 +1,146 @@
+"""Shared latest version lookups of the SSH integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import time
+
+from ssh_terminal_manager import CommandOutput, SensorKey, SSHManager, VersionSensor
+
+LOOKUP_MAX_AGE = 86400
+
+LookupKey = tuple[str, str, str]
+
+
+class LookupCache:
+    """Outputs of latest version lookups shared by all devices.
+
+    Outputs are keyed by OS name, OS release and command string,
+    devices with the same key use the last successful output while
+    it is younger than their window. Concurrent lookups with the
+    same key wait for the first one instead of executing the command.
+    """
+
+    def __init__(self) -> None:
+        self._outputs: dict[LookupKey, CommandOutput] = {}
+        self._pending: dict[LookupKey, asyncio.Future[CommandOutput | None]] = {}
+
+    def _get(self, key: LookupKey, window: int) -> CommandOutput | None:
+        if (
+            output := self._outputs.get(key)
+        ) and time.time() - output.timestamp < window:
+            return output
+        return None
+
+    def _set(self, key: LookupKey, output: CommandOutput) -> None:
+        deadline = time.time() - LOOKUP_MAX_AGE
+        self._outputs = {
+            cached_key: cached
+            for cached_key, cached in self._outputs.items()
+            if cached.timestamp > deadline
+        }
+        self._outputs[key] = output
+
+    async def async_get(
+        self,
+        key: LookupKey,
+        window: int,
+        execute: Callable[[], Awaitable[CommandOutput]],
+    ) -> CommandOutput:
+        """Get the output of a lookup, call `execute` if there is none.
+
+        Raises:
+            Exceptions of `execute`
+
+        """
+        if output := self._get(key, window):
+            return output
+
+        while future := self._pending.get(key):
+            if output := await asyncio.shield(future):
+                return output
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+
+        try:
+            output = await execute()
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            if self._pending.get(key) is future:
+                self._pending.pop(key)
+
+        if output.code == 0:
+            self._set(key, output)
+            future.set_result(output)
+        else:
+            future.set_result(None)
+
+        return output
+
+
+LOOKUP_CACHE = LookupCache()
+
+
+def get_lookup_strings(manager: SSHManager) -> set[str]:
+    """Get the strings of the sensor commands that only provide latest versions.
+
+    Commands with other sensors aren't shared, since their values are
+    specific to the device.
+    """
+    latest_keys = {
+        sensor.latest
+        for sensor in manager.sensors_by_key.values()
+        if isinstance(sensor, VersionSensor) and sensor.latest
+    }
+    return {
+        command.string
+        for command in manager.sensor_commands
+        if command.sensors
+        and all(sensor.key in latest_keys for sensor in command.sensors)
+    }
+
+
+class SharedLookups:
+    """Latest version lookups of a device that are shared with other devices.
+
+    Only commands that render to their configured string are shared,
+    commands with templates or sensor values are always executed.
+    """
+
+    def __init__(self, manager: SSHManager, window: int) -> None:
+        self._manager = manager
+        self._window = window
+        self._strings = get_lookup_strings(manager)
+
+    def get_key(self, string: str) -> LookupKey | None:
+        """Get the cache key of a command string.
+
+        Returns:
+            `None` if the command isn't shared or the OS is unknown.
+
+        """
+        if string not in self._strings:
+            return None
+
+        values = [
+            sensor.value if (sensor := self._manager.sensors_by_key.get(key)) else None
+            for key in (SensorKey.OS_NAME, SensorKey.OS_RELEASE, SensorKey.OS_VERSION)
+        ]
+
+        if values[0] is None or (release := values[1] or values[2]) is None:
+            return None
+
+        return (str(values[0]), str(release), string)
+
+    async def async_execute(
+        self, string: str, execute: Callable[[], Awaitable[CommandOutput]]
+    ) -> CommandOutput:
+        """Get the shared output of a command string, call `execute` if needed."""
+        if not (key := self.get_key(string)):
+            return await execute()
+
+        return await LOOKUP_CACHE.async_get(key, self._window, execute)
@@ -11,7 +11,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .base_entity import BaseSensorEntity
+from .base_entity import CoalescingSensorEntity
 from .entry_data import EntryData
 from .helpers import get_child_add_handler, get_child_remove_handler
 
@@ -52,7 +52,7 @@ async def async_get_entities(
     return entities
 
 
-class Entity(BaseSensorEntity, NumberEntity):
+class Entity(CoalescingSensorEntity, NumberEntity):
     _entity_id_format = ENTITY_ID_FORMAT
     _sensor: NumberSensor
 
@@ -62,7 +62,7 @@ class Entity(BaseSensorEntity, NumberEntity):
 
     @property
     def native_value(self) -> int | float | None:
-        return self._sensor.value
+        return self._value
 
     @property
     def native_max_value(self) -> float:
@@ -83,4 +83,4 @@ class Entity(BaseSensorEntity, NumberEntity):
     async def async_set_native_value(self, value: float) -> None:
         if not self._sensor.float:
             value = int(value)
-        await self.coordinator.async_set_sensor_value(self.key, value)
+        await self.async_write_value(value)
@@ -0,0 +1,253 @@
+"""Output handling of the SSH integration."""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from dataclasses import replace
+import bisect
+import os
+from pathlib import Path
+import re
+import secrets
+import signal
+import time
+from typing import overload
+
+from ssh_terminal_manager import CommandOutput
+
+SENSOR_OUTPUT_LIMIT = 1024 * 1024
+SPOOL_THRESHOLD = 256 * 1024
+SPOOL_PREVIEW_SIZE = 4096
+SPOOL_MAX_AGE = 86400
+REPR_LIMIT = 4096
+READ_SIZE = 64 * 1024
+LINE_BREAK = re.compile(b"\n")
+# Exit code of a command whose output was cut, like the code of a
+# shell command whose reader stopped reading
+OUTPUT_CUT_CODE = 128 + signal.SIGPIPE
+
+output_limit: ContextVar[int | None] = ContextVar(
+    "output_limit", default=SENSOR_OUTPUT_LIMIT
+)
+
+
+@contextmanager
+def unlimited_output() -> Iterator[None]:
+    """Don't limit the output of the commands executed in the context."""
+    token = output_limit.set(None)
+    try:
+        yield
+    finally:
+        output_limit.reset(token)
+
+
+def read_limited(read: Callable[[int], bytes], limit: int | None) -> tuple[bytes, bool]:
+    """Read chunks until the end or until more than `limit` bytes were read.
+
+    Returns:
+        The data, cut after `limit + 1` bytes, and if it was cut.
+
+    """
+    data = bytearray()
+
+    while chunk := read(READ_SIZE):
+        data += chunk
+        if limit is not None and len(data) > limit:
+            return bytes(data[: limit + 1]), True
+
+    return bytes(data), False
+
+
+async def async_read_limited(
+    read: Callable[[int], Awaitable[bytes]], limit: int | None
+) -> tuple[bytes, bool]:
+    """Read chunks until the end or until more than `limit` bytes were read.
+
+    Returns:
+        The data, cut after `limit + 1` bytes, and if it was cut.
+
+    """
+    data = bytearray()
+
+    while chunk := await read(READ_SIZE):
+        data += chunk
+        if limit is not None and len(data) > limit:
+            return bytes(data[: limit + 1]), True
+
+    return bytes(data), False
+
+
+def get_line_ends(data: bytes) -> list[int]:
+    """Get the position of the line break after every line of `data`."""
+    ends = [match.start() for match in LINE_BREAK.finditer(data)]
+
+    if data and data[-1:] != b"\n":
+        ends.append(len(data))
+
+    return ends
+
+
+class OutputLines(Sequence[str]):
+    """Lines of command output that are decoded when they are used.
+
+    The output is kept as bytes together with the positions of its
+    line breaks. Lines are decoded from a `memoryview` of the bytes
+    when they are accessed, slices share the bytes. Like the lines of
+    `SSHTerminal`, they don't contain other line breaks (like `\r`).
+    """
+
+    def __init__(
+        self, data: bytes, start: int = 0, ends: list[int] | None = None
+    ) -> None:
+        self.data = data
+        self._view = memoryview(data)
+        self._start = start
+        self._ends = get_line_ends(data) if ends is None else ends
+
+    @property
+    def size(self) -> int:
+        """Size of the lines in bytes, including line breaks."""
+        return self._ends[-1] - self._start + 1 if self._ends else 0
+
+    def tobytes(self) -> bytes:
+        """Get the bytes of the lines, including the line breaks between them."""
+        return self.data[self._start : self._ends[-1]] if self._ends else b""
+
+    def truncate(self, size: int) -> OutputLines:
+        """Get the lines that fit into `size` bytes.
+
+        The bytes after the last line are released.
+        """
+        if (count := bisect.bisect_left(self._ends, self._start + size)) == len(self):
+            return self
+
+        ends = self._ends[:count]
+        return OutputLines(
+            self.data[: ends[-1] + 1] if ends else b"", self._start, ends
+        )
+
+    def _get_start(self, index: int) -> int:
+        return self._ends[index - 1] + 1 if index else self._start
+
+    def _decode(self, start: int, end: int) -> str:
+        return "".join(str(self._view[start:end], "utf-8", "replace").splitlines())
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | Sequence[str]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return OutputLines(
+                self.data, self._get_start(start), self._ends[start:stop]
+            )
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+
+        return self._decode(self._get_start(index), self._ends[index])
+
+    def __reduce__(self) -> tuple:
+        return OutputLines, (self.data, self._start, self._ends)
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __iter__(self) -> Iterator[str]:
+        start = self._start
+        for end in self._ends:
+            yield self._decode(start, end)
+            start = end + 1
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        if self.size <= REPR_LIMIT:
+            return repr(list(self))
+        return f"<{len(self)} lines, {self.size} bytes>"
+
+
+def get_size(lines: Sequence[str]) -> int:
+    """Get the size of lines in characters, including line breaks.
+
+    The size of `OutputLines` is counted in bytes.
+    """
+    if isinstance(lines, OutputLines):
+        return lines.size
+    return sum(map(len, lines)) + len(lines)
+
+
+def _truncate(lines: Sequence[str], size: int) -> Sequence[str]:
+    if isinstance(lines, OutputLines):
+        return lines.truncate(size)
+    for i, line in enumerate(lines):
+        if (size := size - len(line) - 1) < 0:
+            return lines[:i]
+    return lines
+
+
+def limit_output(output: CommandOutput) -> CommandOutput:
+    """Cut stdout and stderr of an output at the current output limit.
+
+    A cut output gets the exit code `OUTPUT_CUT_CODE` unless the
+    command failed with another one, so it isn't taken for complete.
+    """
+    if (limit := output_limit.get()) is None:
+        return output
+
+    if get_size(output.stdout) <= limit and get_size(output.stderr) <= limit:
+        return output
+
+    return replace(
+        output,
+        stdout=_truncate(output.stdout, limit),
+        stderr=_truncate(output.stderr, limit),
+        code=output.code or OUTPUT_CUT_CODE,
+    )
+
+
+def _remove_old_files(directory: Path) -> None:
+    deadline = time.time() - SPOOL_MAX_AGE
+
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.stat().st_mtime < deadline:
+            with suppress(OSError):
+                os.remove(entry.path)
+
+
+def spool_lines(directory: str, name: str, lines: Sequence[str]) -> dict:
+    """Write lines to a new file in `directory`.
+
+    Files older than `SPOOL_MAX_AGE` are removed from the directory.
+
+    Returns:
+        Path, size and preview of the lines.
+
+    """
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    _remove_old_files(path)
+    path /= f"{name}_{int(time.time())}_{secrets.token_hex(4)}.txt"
+
+    with path.open("w", encoding="utf-8", errors="replace") as file:
+        for line in lines:
+            file.write(line)
+            file.write("\n")
+
+    return {
+        "path": str(path),
+        "size": path.stat().st_size,
+        "preview": list(_truncate(lines, SPOOL_PREVIEW_SIZE)),
+    }
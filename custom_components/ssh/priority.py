@@ -0,0 +1,134 @@
+"""Priority lanes of the SSH integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+import time
+
+LANE_INTERACTIVE = "interactive"
+LANE_BACKGROUND = "background"
+LANES = (LANE_INTERACTIVE, LANE_BACKGROUND)
+LANE_STATS_SIZE = 100
+
+current_lane: ContextVar[str] = ContextVar("current_lane", default=LANE_INTERACTIVE)
+
+
+@contextmanager
+def background_lane() -> Iterator[None]:
+    """Run the manager operations of the context in the background lane."""
+    token = current_lane.set(LANE_BACKGROUND)
+    try:
+        yield
+    finally:
+        current_lane.reset(token)
+
+
+class LaneStats:
+    """Wait times of the last operations of a lane."""
+
+    def __init__(self) -> None:
+        self._waits: deque[float] = deque(maxlen=LANE_STATS_SIZE)
+        self.count = 0
+        self.waiting = 0
+
+    @property
+    def last(self) -> float | None:
+        """Last wait time in seconds."""
+        return self._waits[-1] if self._waits else None
+
+    @property
+    def average(self) -> float | None:
+        """Average wait time of the last operations in seconds."""
+        return sum(self._waits) / len(self._waits) if self._waits else None
+
+    @property
+    def max(self) -> float | None:
+        """Maximum wait time of the last operations in seconds."""
+        return max(self._waits) if self._waits else None
+
+    def add(self, wait: float) -> None:
+        """Add a wait time."""
+        self._waits.append(wait)
+        self.count += 1
+
+
+class PriorityLock:
+    """Reentrant lock of a manager with priority lanes.
+
+    When the lock is released it is handed over to the longest
+    waiting task of the first lane in `LANES` that has waiters,
+    so interactive operations don't wait behind queued polls.
+    """
+
+    def __init__(self) -> None:
+        self._owner: asyncio.Task | asyncio.Future | None = None
+        self._depth = 0
+        self._waiters: dict[str, deque[asyncio.Future]] = {
+            lane: deque() for lane in LANES
+        }
+        self.stats = {lane: LaneStats() for lane in LANES}
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *args) -> None:
+        self.release()
+
+    def locked(self) -> bool:
+        """Return `True` if the lock is acquired."""
+        return self._owner is not None
+
+    async def acquire(self) -> bool:
+        """Acquire the lock."""
+        task = asyncio.current_task()
+
+        if self._owner is task:
+            self._depth += 1
+            return True
+
+        lane = current_lane.get()
+        stats = self.stats[lane]
+        start = time.monotonic()
+
+        if self._owner is not None or any(self._waiters.values()):
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[lane].append(future)
+            stats.waiting += 1
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._owner = None
+                    self._wake()
+                else:
+                    with suppress(ValueError):
+                        self._waiters[lane].remove(future)
+                raise
+            finally:
+                stats.waiting -= 1
+
+        self._owner = task
+        self._depth = 1
+        stats.add(time.monotonic() - start)
+        return True
+
+    def release(self) -> None:
+        """Release the lock."""
+        self._depth -= 1
+
+        if self._depth == 0:
+            self._owner = None
+            self._wake()
+
+    def _wake(self) -> None:
+        for lane in LANES:
+            while waiters := self._waiters[lane]:
+                future = waiters.popleft()
+                if not future.done():
+                    self._owner = future
+                    future.set_result(None)
+                    return
@@ -0,0 +1,79 @@
+"""Probe commands for the SSH integration."""
+
+from __future__ import annotations
+
+from ssh_terminal_manager import CommandOutput, SensorCommand, SensorKey, TextSensor
+
+# Prints `%OS% :OS` in POSIX shells, `%OS%` and `Windows_NT` in
+# PowerShell and `Windows_NT $env:OS` in cmd
+DETECT_COMMAND = "echo %OS% $env:OS"
+
+PROBE_COMMANDS: dict[str, SensorCommand] = {
+    "linux": SensorCommand(
+        "uname -s; "
+        "uname -n; "
+        '(. /etc/os-release && echo "$PRETTY_NAME") 2>/dev/null || echo; '
+        "x=$(/sbin/ip route show default 2>/dev/null | awk '{print $5; exit}'); "
+        '[ -n "$x" ] || '
+        "x=$(/sbin/route -n 2>/dev/null | awk '/^0.0.0.0/ {print $NF; exit}'); "
+        "cat /sys/class/net/$x/address 2>/dev/null || echo",
+        sensors=[
+            TextSensor(key=SensorKey.OS_NAME),
+            TextSensor(key=SensorKey.HOSTNAME),
+            TextSensor(key=SensorKey.OS_RELEASE),
+            TextSensor(key=SensorKey.MAC_ADDRESS),
+        ],
+    ),
+    "windows_ps": SensorCommand(
+        "$x = Get-CimInstance Win32_OperatingSystem | "
+        "Select Caption,CSName; "
+        "$y = Get-CimInstance Win32_IP4RouteTable "
+        "-Filter \"Destination='0.0.0.0'\" | "
+        "Select -First 1 InterfaceIndex; "
+        "$z = Get-CimInstance Win32_NetworkAdapter "
+        '-Filter "InterfaceIndex=$($y.InterfaceIndex)" | '
+        "Select MACAddress; "
+        "$x.Caption; "
+        "$x.CSName; "
+        "$z.MACAddress",
+        sensors=[
+            TextSensor(key=SensorKey.OS_NAME),
+            TextSensor(key=SensorKey.HOSTNAME),
+            TextSensor(key=SensorKey.MAC_ADDRESS),
+        ],
+    ),
+    "windows_cmd": SensorCommand(
+        "@echo %OS%& "
+        "hostname& "
+        "for /f %i in ('wmic path win32_ip4routetable "
+        "where \"Destination='0.0.0.0'\" "
+        "get InterfaceIndex ^| "
+        'findstr /r "\\<[0-9][0-9]*\\>"\') do '
+        '@for /f "skip=2 tokens=2 delims=," %j in (\'wmic nic '
+        'where "InterfaceIndex=%i" '
+        "get MACAddress /format:csv') do "
+        "@echo %j",
+        sensors=[
+            TextSensor(key=SensorKey.OS_NAME),
+            TextSensor(key=SensorKey.HOSTNAME),
+            TextSensor(key=SensorKey.MAC_ADDRESS),
+        ],
+    ),
+}
+
+PROBE_ALIASES = {
+    "linux_snapshot": "linux",
+}
+
+
+def get_probe_key(output: CommandOutput) -> str:
+    """Get the key of the probe command for the output of `DETECT_COMMAND`."""
+    lines = [line.strip() for line in output.stdout]
+
+    if lines and lines[0].startswith("Windows_NT"):
+        return "windows_cmd"
+
+    if "Windows_NT" in lines:
+        return "windows_ps"
+
+    return "linux"
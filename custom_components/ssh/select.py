@@ -10,7 +10,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .base_entity import BaseSensorEntity
+from .base_entity import CoalescingSensorEntity
 from .entry_data import EntryData
 from .helpers import get_child_add_handler, get_child_remove_handler
 
@@ -53,7 +53,7 @@ async def async_get_entities(
     return entities
 
 
-class Entity(BaseSensorEntity, SelectEntity):
+class Entity(CoalescingSensorEntity, SelectEntity):
     _entity_id_format = ENTITY_ID_FORMAT
     _sensor: TextSensor
 
@@ -63,7 +63,7 @@ class Entity(BaseSensorEntity, SelectEntity):
 
     @property
     def current_option(self) -> str | None:
-        return self._sensor.value
+        return self._value
 
     async def async_select_option(self, option: str) -> None:
-        await self.coordinator.async_set_sensor_value(self.key, option)
+        await self.async_write_value(option)
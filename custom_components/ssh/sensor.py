@@ -4,24 +4,39 @@ from __future__ import annotations
 
 from datetime import date, datetime
 from decimal import Decimal
+from typing import Any
 
 from ssh_terminal_manager import BinarySensor, NumberSensor, TextSensor, VersionSensor
 
 from homeassistant.components.sensor import (
     ENTITY_ID_FORMAT,
+    SensorDeviceClass,
     SensorEntity,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_platform
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 
-from .base_entity import BaseSensorEntity
-from .const import CONF_SUGGESTED_DISPLAY_PRECISION, CONF_SUGGESTED_UNIT_OF_MEASUREMENT
+from .base_entity import BaseEntity, BaseSensorEntity
+from .compress import CompressedCommand, CompressionStats, get_compression_stats
+from .const import (
+    CONF_BACKEND,
+    CONF_SUGGESTED_DISPLAY_PRECISION,
+    CONF_SUGGESTED_UNIT_OF_MEASUREMENT,
+    DOMAIN,
+)
 from .entry_data import EntryData
 from .helpers import get_child_add_handler, get_child_remove_handler
+from .priority import LANE_BACKGROUND, LANE_INTERACTIVE, LaneStats
+from .terminal import SSH_EXECUTOR
+
+DATA_EXECUTOR_ENTITIES = "ssh_executor_entities"
 
 
 async def async_setup_entry(
@@ -32,7 +47,55 @@ async def async_setup_entry(
     """Set up the sensor platform."""
     entry_data: EntryData = hass.data[entry.domain][entry.entry_id]
     entities = await async_get_entities(hass, entry_data)
-    async_add_entities(entities)
+    async_add_entities(
+        [
+            *entities,
+            InteractiveLaneEntity(entry_data),
+            BackgroundLaneEntity(entry_data),
+        ]
+    )
+
+    if any(
+        isinstance(command, CompressedCommand)
+        for command in entry_data.manager.sensor_commands
+    ):
+        async_add_entities([CompressionEntity(entry_data)])
+
+    if entry.data[CONF_BACKEND] == "thread":
+        async_setup_executor_entities(hass, entry, async_add_entities)
+
+
+@callback
+def async_setup_executor_entities(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the executor entities once for all entries of the thread backend.
+
+    The first entry adds them, when it is unloaded the next entry
+    adds them again.
+    """
+    add_callbacks: dict[str, AddEntitiesCallback] = hass.data.setdefault(
+        DATA_EXECUTOR_ENTITIES, {}
+    )
+
+    if not add_callbacks:
+        async_add_entities([ExecutorQueueEntity(), ExecutorUsageEntity()])
+
+    add_callbacks[entry.entry_id] = async_add_entities
+
+    @callback
+    def async_remove() -> None:
+        owner = next(iter(add_callbacks)) == entry.entry_id
+        add_callbacks.pop(entry.entry_id)
+
+        if owner and add_callbacks:
+            next(iter(add_callbacks.values()))(
+                [ExecutorQueueEntity(), ExecutorUsageEntity()]
+            )
+
+    entry.async_on_unload(async_remove)
 
 
 async def async_get_entities(
@@ -96,3 +159,112 @@ class Entity(BaseSensorEntity, SensorEntity):
     @property
     def suggested_unit_of_measurement(self) -> str | None:
         return self._attributes.get(CONF_SUGGESTED_UNIT_OF_MEASUREMENT)
+
+
+class DiagnosticEntity(BaseEntity, SensorEntity):
+    _entity_id_format = ENTITY_ID_FORMAT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def entity_registry_enabled_default(self) -> bool:
+        return False
+
+    @property
+    def available(self) -> bool:
+        return True
+
+
+class ExecutorEntity(SensorEntity):
+    """Entity of the thread pool shared by all entries, updated by polling."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+    _attr_should_poll = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_device_info = DeviceInfo(
+        entry_type=DeviceEntryType.SERVICE,
+        identifiers={(DOMAIN, "executor")},
+        name="SSH executor",
+    )
+
+
+class ExecutorQueueEntity(ExecutorEntity):
+    _attr_name = "Queue"
+    _attr_unique_id = f"{DOMAIN}_executor_queue"
+
+    @property
+    def native_value(self) -> int:
+        return SSH_EXECUTOR.queued
+
+
+class ExecutorUsageEntity(ExecutorEntity):
+    _attr_name = "Usage"
+    _attr_unique_id = f"{DOMAIN}_executor_usage"
+    _attr_native_unit_of_measurement = PERCENTAGE
+
+    @property
+    def native_value(self) -> float:
+        return SSH_EXECUTOR.usage
+
+
+class LaneEntity(DiagnosticEntity):
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 1
+    _lane: str
+
+    @property
+    def _stats(self) -> LaneStats:
+        return self._manager.lock.stats[self._lane]
+
+    @property
+    def native_value(self) -> float | None:
+        if (average := self._stats.average) is None:
+            return None
+        return average * 1000
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        stats = self._stats
+        return {
+            "last": None if stats.last is None else stats.last * 1000,
+            "max": None if stats.max is None else stats.max * 1000,
+            "count": stats.count,
+            "waiting": stats.waiting,
+        }
+
+
+class InteractiveLaneEntity(LaneEntity):
+    _attr_name = "Interactive lane wait"
+    _lane = LANE_INTERACTIVE
+
+
+class BackgroundLaneEntity(LaneEntity):
+    _attr_name = "Background lane wait"
+    _lane = LANE_BACKGROUND
+
+
+class CompressionEntity(DiagnosticEntity):
+    _attr_name = "Compression savings"
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_suggested_display_precision = 1
+
+    @property
+    def _stats(self) -> CompressionStats:
+        return get_compression_stats(self._manager.sensor_commands)
+
+    @property
+    def native_value(self) -> float | None:
+        return self._stats.savings
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        stats = self._stats
+        return {
+            "received": stats.received,
+            "decoded": stats.decoded,
+            "decode_time": stats.decode_time * 1000,
+            "count": stats.count,
+        }
@@ -0,0 +1,77 @@
+"""Persistent shell sessions of the SSH integration."""
+
+from __future__ import annotations
+
+import itertools
+import re
+import secrets
+import time
+
+from ssh_terminal_manager import CommandOutput
+
+from .output import OutputLines
+
+_command_ids = itertools.count()
+
+
+class ShellCommand:
+    """Command for a POSIX shell that stays open between commands.
+
+    The command runs in a subshell, so changes of the shell state
+    (like `cd`, exported variables or `exit`) don't reach the following
+    commands. Its output is framed by a start and an end marker that
+    are unique for every command, the end marker contains the exit
+    code. The markers are found anywhere in a line, as terminal
+    escape sequences or output without a final line break can
+    precede them. The echo of the input can't match them, the start
+    marker is followed by the subshell and the exit code isn't
+    expanded yet.
+
+    The output is collected in one buffer, which is only searched
+    from the last incomplete line on when more output arrives.
+    """
+
+    def __init__(self, string: str) -> None:
+        self.string = string
+        marker = f"__ssh_{secrets.token_hex(4)}_{next(_command_ids)}"
+        lines = [
+            f"echo {marker}_start; (",
+            *(string.splitlines() or [":"]),
+            f"); echo {marker}_end_$?",
+        ]
+        self.input = "".join(f"{line}\r" for line in lines).encode()
+        self._start_pattern = re.compile(rf"{marker}_start\r?\n".encode())
+        self._end_pattern = re.compile(rf"{marker}_end_(\d+)\r?\n".encode())
+        self._buffer = bytearray()
+        self._pos = 0
+        self._start: int | None = None
+        self._end: int | None = None
+        self._code = 0
+
+    def feed(self, data: bytes) -> bool:
+        """Add output of the shell and return `True` when the command ended."""
+        self._buffer += data
+
+        if self._start is None:
+            if not (match := self._start_pattern.search(self._buffer, self._pos)):
+                self._pos = self._buffer.rfind(b"\n") + 1
+                return False
+            self._start = self._pos = match.end()
+
+        if not (match := self._end_pattern.search(self._buffer, self._pos)):
+            self._pos = max(self._buffer.rfind(b"\n") + 1, self._start)
+            return False
+
+        self._end = match.start()
+        self._code = int(match[1])
+        return True
+
+    def get_output(self) -> CommandOutput:
+        """Get the output of the ended command."""
+        return CommandOutput(
+            self.string,
+            time.time(),
+            OutputLines(bytes(self._buffer[self._start : self._end])),
+            [],
+            self._code,
+        )
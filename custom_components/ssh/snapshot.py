@@ -0,0 +1,245 @@
+"""Snapshot commands of the SSH integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from ssh_terminal_manager import (
+    BinarySensor,
+    Collection,
+    NumberSensor,
+    SensorKey,
+    SSHManager,
+    TextSensor,
+    default_collections,
+)
+
+from .table import TableCommand, TableNumberSensor, split_table
+
+SECTION_PREFIX = "--"
+
+READ_LINE = 'r() { x=; read -r x < "$1"; printf "%s\\n" "$x"; } 2>/dev/null'
+
+CPU_SAMPLE = f"echo {SECTION_PREFIX}{SensorKey.CPU_LOAD}; r /proc/stat; sleep 1"
+
+LINUX_STATIC_SNAPSHOT = "\n".join(
+    [
+        READ_LINE,
+        "i=; while read -r a b _; do",
+        '[ "$b" = 00000000 ] && i=$a && break; done < /proc/net/route',
+        f'echo {SECTION_PREFIX}{SensorKey.NETWORK_INTERFACE}; echo "$i"',
+        f'echo {SECTION_PREFIX}{SensorKey.MAC_ADDRESS}; r "/sys/class/net/$i/address"',
+        (
+            f"echo {SECTION_PREFIX}{SensorKey.WAKE_ON_LAN}; "
+            'r "/sys/class/net/$i/device/power/wakeup"'
+        ),
+        f"echo {SECTION_PREFIX}{SensorKey.HOSTNAME}; r /proc/sys/kernel/hostname",
+        f"echo {SECTION_PREFIX}{SensorKey.MACHINE_TYPE}; uname -m",
+        f"echo {SECTION_PREFIX}{SensorKey.OS_NAME}; r /proc/sys/kernel/ostype",
+        f"echo {SECTION_PREFIX}{SensorKey.OS_VERSION}; r /proc/sys/kernel/osrelease",
+        (
+            f"echo {SECTION_PREFIX}{SensorKey.OS_RELEASE}; "
+            '(. /etc/os-release && echo "$PRETTY_NAME") 2>/dev/null'
+        ),
+        (
+            f"echo {SECTION_PREFIX}{SensorKey.DEVICE_NAME}; "
+            "r /sys/class/dmi/id/product_name"
+        ),
+        (
+            f"echo {SECTION_PREFIX}{SensorKey.DEVICE_MODEL}; "
+            "r /sys/class/dmi/id/product_version"
+        ),
+        (
+            f"echo {SECTION_PREFIX}{SensorKey.MANUFACTURER}; "
+            "r /sys/class/dmi/id/sys_vendor"
+        ),
+        (
+            f"echo {SECTION_PREFIX}{SensorKey.SERIAL_NUMBER}; "
+            "r /sys/class/dmi/id/product_serial"
+        ),
+        (
+            "awk -F ': ' '"
+            "/^model name/ {a=$2} "
+            "/^processor/ {b=$2+1} "
+            "/^Hardware/ {c=$2} "
+            "/^Model/ {d=$2} "
+            f'END {{print "{SECTION_PREFIX}{SensorKey.CPU_NAME}\\n"a'
+            f'"\\n{SECTION_PREFIX}{SensorKey.CPU_CORES}\\n"b'
+            f'"\\n{SECTION_PREFIX}{SensorKey.CPU_HARDWARE}\\n"c'
+            f'"\\n{SECTION_PREFIX}{SensorKey.CPU_MODEL}\\n"d}}\' /proc/cpuinfo'
+        ),
+        f"echo {SECTION_PREFIX}{SensorKey.TOTAL_MEMORY}",
+        "while read -r k v _; do",
+        '[ "$k" = MemTotal: ] && echo "$v" && break; done < /proc/meminfo',
+    ]
+)
+
+LINUX_SNAPSHOT = "\n".join(
+    [
+        READ_LINE,
+        f"echo {SECTION_PREFIX}{SensorKey.FREE_MEMORY}",
+        "while read -r k v _; do",
+        '[ "$k" = MemFree: ] && echo "$v" && break; done < /proc/meminfo',
+        f"echo {SECTION_PREFIX}{SensorKey.CPU_LOAD}; r /proc/stat",
+        f'echo {SECTION_PREFIX}{SensorKey.PROCESSES}; set -- /proc/[0-9]*; echo "$#"',
+        f"echo {SECTION_PREFIX}{SensorKey.FREE_DISK_SPACE}",
+        (
+            "df -kP 2>/dev/null | awk '/^\\/dev\\// {"
+            "b=$4; "
+            '$1=$2=$3=$4=$5=""; '
+            'gsub(/^ +/, ""); '
+            'print $0"|"b}\''
+        ),
+        f"echo {SECTION_PREFIX}{SensorKey.TEMPERATURE}",
+        "for x in /sys/class/thermal/thermal_zone*; do",
+        '[ -r "$x/temp" ] || continue',
+        'read -r t < "$x/type"; read -r v < "$x/temp"',
+        'echo "$t|$((v / 1000))"; done',
+    ]
+)
+
+
+def get_sections(lines: list[str]) -> dict[str, list[str]]:
+    """Get the lines of the sections of a snapshot output by name."""
+    sections: dict[str, list[str]] = {}
+    section = None
+
+    for line in lines:
+        if line.startswith(SECTION_PREFIX):
+            section = sections.setdefault(line[len(SECTION_PREFIX) :].strip(), [])
+        elif section is not None:
+            section.append(line)
+
+    return sections
+
+
+def get_cpu_load(first: list[int], second: list[int]) -> int | None:
+    """Get the CPU load in percent between two `/proc/stat` samples."""
+    idle = sum(second[3:5]) - sum(first[3:5])
+    total = sum(second[:8]) - sum(first[:8])
+
+    if total <= 0 or idle < 0:
+        return None
+
+    return 100 * (total - idle) // total
+
+
+@dataclass
+class SnapshotCommand(TableCommand):
+    """Sensor command that reads the values of many sensors at once.
+
+    The output consists of sections that start with `SECTION_PREFIX`
+    followed by a sensor key. Sensors receive the first line of their
+    section, dynamic sensors one child per line with `separator`
+    between ID and value. The `cpu_load` section contains `/proc/stat`
+    samples, the load is calculated from the previous execution, so
+    only the first execution waits for a second sample.
+    """
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._cpu_sample: list[int] | None = None
+
+    async def async_render_string(
+        self,
+        manager: SSHManager,
+        variables: dict | None = None,
+    ) -> str:
+        string = await super().async_render_string(manager, variables)
+        lines = ["(", string, ")"]
+
+        if self._cpu_sample is None and SensorKey.CPU_LOAD in self.sensors_by_key:
+            lines[1:1] = [READ_LINE, CPU_SAMPLE]
+
+        return "\n".join(lines)
+
+    def _get_cpu_load(self, lines: list[str]) -> str | None:
+        samples = [self._cpu_sample] if self._cpu_sample else []
+
+        for line in lines:
+            try:
+                samples.append([int(field) for field in line.split()[1:9]])
+            except ValueError:
+                continue
+
+        if not samples:
+            return None
+
+        self._cpu_sample = samples[-1]
+
+        if len(samples) < 2 or (load := get_cpu_load(*samples[-2:])) is None:
+            return None
+
+        return str(load)
+
+    def update_sensors(self, manager: SSHManager) -> None:
+        """Update sensors from the sections of the output."""
+        if not (output := self.output) or output.code > 0:
+            self.clear_sensor_values(manager)
+            return
+
+        sections = get_sections(output.stdout)
+
+        if (lines := sections.get(SensorKey.CPU_LOAD)) is not None:
+            load = self._get_cpu_load(lines)
+            sections[SensorKey.CPU_LOAD] = [load] if load else []
+
+        for sensor in self.sensors:
+            lines = sections.get(sensor.key, [])
+
+            if not sensor.dynamic:
+                sensor.update(manager, lines[0] if lines else None)
+                continue
+
+            self.update_dynamic_sensor(
+                manager,
+                sensor,
+                [
+                    (id_, values[0], name)
+                    for id_, values, name in split_table(lines, self.separator, 1)
+                ],
+            )
+
+
+linux_snapshot = Collection(
+    "Linux (snapshot)",
+    default_collections.linux.action_commands,
+    [
+        SnapshotCommand(
+            LINUX_STATIC_SNAPSHOT,
+            sensors=[
+                TextSensor(key=SensorKey.NETWORK_INTERFACE),
+                TextSensor(key=SensorKey.MAC_ADDRESS),
+                BinarySensor(key=SensorKey.WAKE_ON_LAN),
+                TextSensor(key=SensorKey.HOSTNAME),
+                TextSensor(key=SensorKey.MACHINE_TYPE),
+                TextSensor(key=SensorKey.OS_NAME),
+                TextSensor(key=SensorKey.OS_VERSION),
+                TextSensor(key=SensorKey.OS_RELEASE),
+                TextSensor(key=SensorKey.DEVICE_NAME),
+                TextSensor(key=SensorKey.DEVICE_MODEL),
+                TextSensor(key=SensorKey.MANUFACTURER),
+                TextSensor(key=SensorKey.SERIAL_NUMBER),
+                TextSensor(key=SensorKey.CPU_NAME),
+                NumberSensor(key=SensorKey.CPU_CORES),
+                TextSensor(key=SensorKey.CPU_HARDWARE),
+                TextSensor(key=SensorKey.CPU_MODEL),
+                NumberSensor(key=SensorKey.TOTAL_MEMORY, unit="KiB"),
+            ],
+        ),
+        SnapshotCommand(
+            LINUX_SNAPSHOT,
+            interval=30,
+            separator="|",
+            sensors=[
+                NumberSensor(key=SensorKey.FREE_MEMORY, unit="KiB"),
+                NumberSensor(key=SensorKey.CPU_LOAD, unit="%"),
+                NumberSensor(key=SensorKey.PROCESSES),
+                TableNumberSensor(
+                    key=SensorKey.FREE_DISK_SPACE, dynamic=True, unit="KiB"
+                ),
+                TableNumberSensor(key=SensorKey.TEMPERATURE, dynamic=True, unit="°C"),
+            ],
+        ),
+    ],
+)
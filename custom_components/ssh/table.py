@@ -0,0 +1,156 @@
+"""Dynamic sensor tables of the SSH integration."""
+
+from __future__ import annotations
+
+from dataclasses import KW_ONLY, dataclass, field
+from typing import Any
+
+from ssh_terminal_manager import (
+    BinarySensor,
+    Manager,
+    NumberSensor,
+    Sensor,
+    SensorCommand,
+    SSHManager,
+    TextSensor,
+    VersionSensor,
+)
+from terminal_manager.command import DynamicData
+
+
+def split_table(
+    lines: list[str], separator: str | None, count: int
+) -> list[tuple[str, list[str], str | None]]:
+    """Split the lines of a table with `count` value columns into rows.
+
+    Lines without an ID or with less than `count` values are skipped.
+    """
+    rows = []
+
+    for line in lines:
+        fields = line.split(separator)
+        if len(fields) > count and (id_ := fields[0].strip()):
+            name = fields[count + 1] if len(fields) > count + 1 else None
+            rows.append((id_, fields[1 : count + 1], name))
+
+    return rows
+
+
+class TableSensor(Sensor):
+    """Sensor whose children are updated in one pass over the rows.
+
+    Children are mapped by key once per update, missing children are
+    added and children without a row are removed together. Only
+    children whose value string or value changed since the last
+    update are updated, which keeps large tables (like process lists)
+    fast.
+    """
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._cells: dict[str, tuple[str, Any]] = {}
+
+    def _update_child_sensors(
+        self,
+        manager: Manager,
+        data: list[DynamicData] | None,
+    ) -> None:
+        if data is None:
+            self._cells = {}
+            super()._update_child_sensors(manager, data)
+            return
+
+        dynamic_data_by_key = {dynamic_data.key: dynamic_data for dynamic_data in data}
+        children = {child.key: child for child in self.child_sensors}
+
+        if removed := [key for key in children if key not in dynamic_data_by_key]:
+            self.child_sensors = [
+                child
+                for child in self.child_sensors
+                if child.key in dynamic_data_by_key
+            ]
+            for key in removed:
+                self.on_child_remove.notify(self, children.pop(key))
+
+        for key, dynamic_data in dynamic_data_by_key.items():
+            if not (child := children.get(key)):
+                child = children[key] = self._make_child(dynamic_data)
+                self._add_child(child)
+            if self._cells.get(key) != (dynamic_data.data, child.value):
+                child.update(manager, dynamic_data.data)
+
+        self._cells = {
+            key: (dynamic_data.data, children[key].value)
+            for key, dynamic_data in dynamic_data_by_key.items()
+        }
+
+
+@dataclass
+class TableTextSensor(TableSensor, TextSensor):
+    """Text sensor of a table."""
+
+
+@dataclass
+class TableNumberSensor(TableSensor, NumberSensor):
+    """Number sensor of a table."""
+
+
+@dataclass
+class TableBinarySensor(TableSensor, BinarySensor):
+    """Binary sensor of a table."""
+
+
+@dataclass
+class TableVersionSensor(TableSensor, VersionSensor):
+    """Version sensor of a table."""
+
+
+@dataclass
+class TableCommand(SensorCommand):
+    """Sensor command that splits the table of dynamic sensors once.
+
+    The lines of dynamic sensors are split once for all of them and
+    passed to the sensors, `TableSensor` children are only updated
+    when their row changed. Commands without dynamic sensors are
+    updated by `SensorCommand`. Changes of the remote paths in `watch`
+    refresh the command.
+    """
+
+    _: KW_ONLY
+    watch: list[str] = field(default_factory=list)
+
+    def update_dynamic_sensor(
+        self,
+        manager: SSHManager,
+        sensor: Sensor,
+        rows: list[tuple[str, str, str | None]],
+    ) -> None:
+        """Update a dynamic sensor from rows of ID, value string and name."""
+        sensor.update(
+            manager,
+            [DynamicData(sensor, id_, string, name) for id_, string, name in rows]
+            or None,
+        )
+
+    def update_sensors(self, manager: SSHManager) -> None:
+        """Update sensors, dynamic sensors from the columns of the output."""
+        dyn_start = next(
+            (i for i, sensor in enumerate(self.sensors) if sensor.dynamic), None
+        )
+
+        if dyn_start is None or not (output := self.output) or output.code > 0:
+            super().update_sensors(manager)
+            return
+
+        data = output.stdout
+
+        for i, sensor in enumerate(self.sensors[:dyn_start]):
+            sensor.update(manager, data[i] if len(data) > i else None)
+
+        dyn_sensors = self.sensors[dyn_start:]
+        rows = split_table(data[dyn_start:], self.separator, len(dyn_sensors))
+
+        for i, sensor in enumerate(dyn_sensors):
+            self.update_dynamic_sensor(
+                manager, sensor, [(id_, values[i], name) for id_, values, name in rows]
+            )
@@ -0,0 +1,177 @@
+"""Log file tail commands of the SSH integration."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import KW_ONLY, dataclass, field, replace
+import re
+import shlex
+
+from ssh_terminal_manager import CommandOutput, SensorCommand, SSHManager
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .output import SENSOR_OUTPUT_LIMIT
+
+EVENT_LOG_LINE = f"{DOMAIN}_log_line"
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+TAIL_READ_LIMIT = SENSOR_OUTPUT_LIMIT // 2
+TAIL_EVENT_LIMIT = 100
+
+
+@dataclass
+class TailCommand(SensorCommand):
+    """Sensor command that follows a remote file.
+
+    Only the bytes that were appended to the file since the last
+    execution are read, the position is tracked by inode and byte
+    offset so rotated or truncated files are read from the start.
+    The offset only advances over complete lines, a line that is
+    still being written is read again by the next execution.
+    The first sensor receives the number of matching lines, the
+    second sensor the last matching line. Changes of the remote
+    paths in `watch` refresh the command.
+    """
+
+    _: KW_ONLY
+    path: str = ""
+    pattern: str | None = None
+    watch: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.inode: str | None = None
+        self.offset = 0
+        self.count = 0
+        self.last_line: str | None = None
+        self.on_update: Callable[[TailCommand, list[str]], None] | None = None
+        self._regex = re.compile(self.pattern) if self.pattern else None
+
+    @property
+    def state(self) -> dict:
+        """Position and match count that can be restored."""
+        return {
+            "inode": self.inode,
+            "offset": self.offset,
+            "count": self.count,
+            "last_line": self.last_line,
+        }
+
+    def restore(self, state: dict) -> None:
+        """Restore position and match count."""
+        self.inode = state.get("inode")
+        self.offset = state.get("offset", 0)
+        self.count = state.get("count", 0)
+        self.last_line = state.get("last_line")
+
+    async def async_render_string(
+        self,
+        manager: SSHManager,
+        variables: dict | None = None,
+    ) -> str:
+        start = (
+            f'o={self.offset}; [ "$i" = {shlex.quote(self.inode)} ] || o=0'
+            if self.inode
+            else "o=$s"
+        )
+        return "\n".join(
+            [
+                f"f={shlex.quote(self.path)}",
+                "i=$(ls -di \"$f\" | awk '{print $1}')",
+                's=$(($(wc -c < "$f"))) || exit 1',
+                start,
+                '[ "$o" -gt "$s" ] && o=0',
+                f'n=$((s - o)); [ "$n" -gt {TAIL_READ_LIMIT} ] && n={TAIL_READ_LIMIT}',
+                'echo "$i $o"',
+                (
+                    'tail -c +$((o + 1)) "$f" | head -c "$n" | LC_ALL=C awk'
+                    f' -v n="$n" -v m={TAIL_READ_LIMIT}'
+                    " '{ l = length($0) + 1; if (s + l > n) exit; s += l; print }"
+                    " END { print (s || n < m ? s + 0 : n) }'"
+                ),
+            ]
+        )
+
+    def handle_success(self, manager: SSHManager, output: CommandOutput) -> None:
+        """Handle success, count matching lines and update sensors."""
+        try:
+            inode, offset = output.stdout[0].split()
+            offset = int(offset) + int(output.stdout[-1])
+        except (IndexError, ValueError):
+            super().handle_success(manager, output)
+            return
+
+        lines = [
+            line
+            for line in output.stdout[1:-1]
+            if not self._regex or self._regex.search(line)
+        ]
+        changed = (inode, offset) != (self.inode, self.offset)
+        self.inode = inode
+        self.offset = offset
+        self.count += len(lines)
+        self.last_line = lines[-1] if lines else self.last_line
+
+        if changed and self.on_update:
+            self.on_update(self, lines)
+
+        super().handle_success(
+            manager,
+            replace(output, stdout=[str(self.count), self.last_line or ""]),
+        )
+
+
+async def async_setup_tail_commands(
+    hass: HomeAssistant, entry: ConfigEntry, manager: SSHManager
+) -> None:
+    """Restore the positions of the tail commands of a manager.
+
+    The positions are saved when they change, the last
+    `TAIL_EVENT_LIMIT` matching lines of every execution are fired
+    as events.
+    """
+    commands = [
+        command
+        for command in manager.sensor_commands
+        if isinstance(command, TailCommand)
+    ]
+
+    if not commands:
+        return
+
+    store: Store[dict] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.tail")
+    data = await store.async_load() or {}
+
+    @callback
+    def handle_update(command: TailCommand, lines: list[str]) -> None:
+        if len(lines) > TAIL_EVENT_LIMIT:
+            manager.logger.warning(
+                "%s: Only the last %s of %s new lines of %s are fired as events",
+                manager.name,
+                TAIL_EVENT_LIMIT,
+                len(lines),
+                command.path,
+            )
+        for line in lines[-TAIL_EVENT_LIMIT:]:
+            hass.bus.async_fire(
+                EVENT_LOG_LINE,
+                {
+                    "config_entry_id": entry.entry_id,
+                    "name": manager.name,
+                    "path": command.path,
+                    "line": line,
+                },
+            )
+        store.async_delay_save(
+            lambda: {command.path: command.state for command in commands},
+            STORAGE_SAVE_DELAY,
+        )
+
+    for command in commands:
+        if state := data.get(command.path):
+            command.restore(state)
+        command.on_update = handle_update
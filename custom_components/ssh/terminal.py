@@ -0,0 +1,685 @@
+"""SSH terminal of the SSH integration."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+import contextvars
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+import paramiko
+from ssh_terminal_manager import (
+    DEFAULT_ADD_HOST_KEYS,
+    CommandOutput,
+    ConnectError,
+    ExecutionError,
+    HostKeyUnknownError,
+    SSHTerminal,
+)
+
+from .output import (
+    OUTPUT_CUT_CODE,
+    READ_SIZE,
+    OutputLines,
+    limit_output,
+    output_limit,
+    read_limited,
+)
+from .shell import ShellCommand
+from .transfer import TransferResult, download, upload
+
+if TYPE_CHECKING:
+    from .lookup import SharedLookups
+
+_LOGGER = logging.getLogger(__name__)
+
+SYSTEM_HOST_KEYS_FILENAME = "~/.ssh/known_hosts"
+HOST_KEYS_WRITE_DELAY = 1
+EXECUTOR_MAX_WORKERS = 16
+CERT_SUFFIX = "-cert.pub"
+
+_T = TypeVar("_T")
+
+
+def _get_mtime(filename: str) -> int | None:
+    try:
+        return os.stat(filename).st_mtime_ns
+    except OSError:
+        return None
+
+
+class HostKeyStore:
+    """Host keys shared by all terminals.
+
+    Every file is parsed once and parsed again only when its
+    modification time changes. Added keys are collected and
+    appended to the file together with a single write, which keeps
+    comments, marker lines, the file mode and symbolic links.
+    With `forward`, added keys are passed to it instead of being
+    written, so worker processes leave writing to the parent.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._host_keys: dict[str, tuple[int | None, paramiko.HostKeys, list[str]]] = {}
+        self._pending: dict[str, list[tuple[str, paramiko.PKey]]] = {}
+        self._timers: dict[str, threading.Timer] = {}
+        self.forward: Callable[[str, str, paramiko.PKey], None] | None = None
+
+    def _load(self, filename: str) -> tuple[paramiko.HostKeys, list[str]]:
+        host_keys = paramiko.HostKeys()
+        markers = []
+
+        if _get_mtime(filename) is not None:
+            with Path.open(filename, encoding="utf-8") as file:
+                for line in file:
+                    if not (line := line.strip()) or line[0] == "#":
+                        continue
+                    if line[0] == "@":
+                        markers.append(line)
+                        continue
+                    try:
+                        entry = paramiko.hostkeys.HostKeyEntry.from_line(line)
+                    except (paramiko.SSHException, paramiko.hostkeys.InvalidHostKey):
+                        continue
+                    for hostname in entry.hostnames if entry else []:
+                        host_keys.add(hostname, entry.key.get_name(), entry.key)
+
+        for hostname, key in self._pending.get(filename, []):
+            host_keys.add(hostname, key.get_name(), key)
+
+        return host_keys, markers
+
+    def _get(self, filename: str) -> tuple[paramiko.HostKeys, list[str]]:
+        with self._lock:
+            mtime = _get_mtime(filename)
+
+            if (cached := self._host_keys.get(filename)) and cached[0] == mtime:
+                return cached[1:]
+
+            host_keys, markers = self._load(filename)
+            self._host_keys[filename] = (mtime, host_keys, markers)
+            return host_keys, markers
+
+    def get(self, filename: str) -> paramiko.HostKeys:
+        """Get the host keys of a file.
+
+        Raises:
+            `OSError`
+
+        """
+        return self._get(filename)[0]
+
+    def get_markers(self, filename: str) -> list[str]:
+        """Get the `@cert-authority` and `@revoked` lines of a file.
+
+        Paramiko can't parse these lines, they are kept for asyncssh.
+
+        Raises:
+            `OSError`
+
+        """
+        return self._get(filename)[1]
+
+    def add(self, filename: str, hostname: str, key: paramiko.PKey) -> None:
+        """Add a host key and schedule writing it to the file."""
+        with self._lock:
+            self.get(filename).add(hostname, key.get_name(), key)
+
+            if self.forward:
+                self.forward(filename, hostname, key)
+                return
+
+            self._pending.setdefault(filename, []).append((hostname, key))
+
+            if filename in self._timers:
+                return
+
+            timer = threading.Timer(HOST_KEYS_WRITE_DELAY, self.write, [filename])
+            timer.daemon = True
+            self._timers[filename] = timer
+            timer.start()
+
+    def write(self, filename: str) -> None:
+        """Write the pending host keys of a file."""
+        with self._lock:
+            self._timers.pop(filename, None)
+
+            if not self._pending.get(filename):
+                return
+
+            lines = [
+                f"{hostname} {key.get_name()} {key.get_base64()}\n"
+                for hostname, key in self._pending[filename]
+            ]
+
+            try:
+                with Path.open(filename, "a+b") as file:
+                    if file.tell():
+                        file.seek(-1, os.SEEK_END)
+                        if file.read(1) != b"\n":
+                            lines.insert(0, "\n")
+                    file.write("".join(lines).encode())
+            except OSError as exc:
+                _LOGGER.warning("Failed to write host keys to %s: %s", filename, exc)
+                return
+
+            self._pending.pop(filename)
+
+
+def _parse_private_key(filename: str, password: str | None) -> paramiko.PKey:
+    """Parse a private key and its certificate `<filename>-cert.pub`."""
+    try:
+        return paramiko.PKey.from_path(filename)
+    except Exception:
+        if password is None:
+            raise
+        return paramiko.PKey.from_path(filename, password.encode())
+
+
+class PrivateKeyStore(Generic[_T]):
+    """Private keys shared by all terminals.
+
+    Every key file is parsed and decrypted once with `parse` and
+    parsed again only when its modification time or the one of
+    its certificate changes.
+    """
+
+    def __init__(self, parse: Callable[[str, str | None], _T]) -> None:
+        self._parse = parse
+        self._lock = threading.Lock()
+        self._keys: dict[tuple[str, str | None], tuple[tuple, _T]] = {}
+
+    def get(self, filename: str, password: str | None = None) -> _T:
+        """Get the private key of a file.
+
+        Raises:
+            Errors of `parse`
+
+        """
+        with self._lock:
+            mtimes = (_get_mtime(filename), _get_mtime(f"{filename}{CERT_SUFFIX}"))
+
+            if (cached := self._keys.get((filename, password))) and cached[0] == mtimes:
+                return cached[1]
+
+            start = time.thread_time()
+            key = self._parse(filename, password)
+            _LOGGER.debug(
+                "Parsed private key %s in %.3fs CPU time",
+                filename,
+                time.thread_time() - start,
+            )
+            self._keys[(filename, password)] = (mtimes, key)
+            return key
+
+
+class SSHExecutor:
+    """Thread pool for the blocking operations of all terminals.
+
+    The pool is separate from the default executor of Home Assistant
+    and limited to `max_workers` threads, further operations wait
+    in the queue until a thread is free.
+    """
+
+    def __init__(self, max_workers: int = EXECUTOR_MAX_WORKERS) -> None:
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="SSH")
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self.queued = 0
+        self.active = 0
+
+    @property
+    def usage(self) -> float:
+        """Percentage of busy threads."""
+        return 100 * self.active / self.max_workers
+
+    async def async_run(self, func: Callable, *args):
+        """Run a blocking function in the pool in a copy of the current context."""
+        context = contextvars.copy_context()
+        started = cancelled = False
+
+        def run():
+            nonlocal started
+            with self._lock:
+                if cancelled:
+                    return None
+                started = True
+                self.queued -= 1
+                self.active += 1
+            try:
+                return context.run(func, *args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+        with self._lock:
+            self.queued += 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, run)
+        finally:
+            with self._lock:
+                if not started:
+                    cancelled = True
+                    self.queued -= 1
+
+
+HOST_KEY_STORE = HostKeyStore()
+PRIVATE_KEY_STORE = PrivateKeyStore(_parse_private_key)
+SSH_EXECUTOR = SSHExecutor()
+
+
+class StoreAddPolicy(paramiko.MissingHostKeyPolicy):
+    def __init__(self, filename: str) -> None:
+        self._filename = filename
+
+    def missing_host_key(
+        self, client: paramiko.SSHClient, hostname: str, key: paramiko.PKey
+    ) -> None:
+        HOST_KEY_STORE.add(self._filename, hostname, key)
+
+
+class RejectPolicy(paramiko.MissingHostKeyPolicy):
+    def missing_host_key(
+        self, client: paramiko.SSHClient, hostname: str, key: paramiko.PKey
+    ) -> None:
+        raise HostKeyUnknownError(hostname)
+
+
+class SharedSSHClient(paramiko.SSHClient):
+    """SSH client that loads keys from `PRIVATE_KEY_STORE` and `HOST_KEY_STORE`."""
+
+    def __init__(self, compress: bool = False) -> None:
+        super().__init__()
+        self._compress = compress
+
+    def use_host_keys(
+        self,
+        system_host_keys: paramiko.HostKeys | None,
+        host_keys: paramiko.HostKeys | None,
+    ) -> None:
+        """Use shared host keys instead of loading them for this client.
+
+        `SSHClient` can only load host keys from files, so this is the
+        only place that sets its host key attributes. The shared
+        objects are only changed through `HOST_KEY_STORE`.
+        """
+        if system_host_keys is not None:
+            self._system_host_keys = system_host_keys
+        if host_keys is not None:
+            self._host_keys = host_keys
+
+    def _get_pkey(self, filename: str, password: str | None) -> paramiko.PKey | None:
+        try:
+            return PRIVATE_KEY_STORE.get(filename, password)
+        except Exception as exc:  # noqa: BLE001
+            _LOGGER.debug("Failed to load key %s: %s", filename, exc)
+            return None
+
+    def connect(
+        self,
+        hostname: str,
+        port: int = paramiko.config.SSH_PORT,
+        username: str | None = None,
+        password: str | None = None,
+        *,
+        key_filename: str | None = None,
+        **kwargs,
+    ) -> None:
+        """Connect with the parsed key of `key_filename` if it can be loaded."""
+        if key_filename and (pkey := self._get_pkey(key_filename, password)):
+            kwargs["pkey"] = pkey
+            key_filename = None
+
+        super().connect(
+            hostname,
+            port,
+            username,
+            password,
+            key_filename=key_filename,
+            compress=self._compress,
+            **kwargs,
+        )
+
+
+class BaseSharedTerminal(ABC):
+    """Base of the terminals of all backends.
+
+    Outputs of `_async_execute` are cut by `limit_output` and shared
+    through `lookups`.
+    """
+
+    lookups: SharedLookups | None = None
+
+    async def async_execute(self, string: str, timeout: int) -> CommandOutput:
+        if self.lookups:
+            return await self.lookups.async_execute(
+                string, lambda: self._async_execute_limited(string, timeout)
+            )
+        return await self._async_execute_limited(string, timeout)
+
+    async def _async_execute_limited(self, string: str, timeout: int) -> CommandOutput:
+        return limit_output(await self._async_execute(string, timeout))
+
+    @abstractmethod
+    async def _async_execute(self, string: str, timeout: int) -> CommandOutput:
+        """Execute a command string.
+
+        Raises:
+            `TimeoutError`
+            `ExecutionError`
+
+        """
+
+    @abstractmethod
+    async def async_upload(
+        self, local_path: str, remote_path: str, resume: bool = False
+    ) -> TransferResult:
+        """Upload a file over SFTP.
+
+        Raises:
+            `ExecutionError`
+
+        """
+
+    @abstractmethod
+    async def async_download(
+        self, remote_path: str, local_path: str, resume: bool = False
+    ) -> TransferResult:
+        """Download a file over SFTP.
+
+        Raises:
+            `ExecutionError`
+
+        """
+
+    @abstractmethod
+    async def async_stream(
+        self, string: str, on_line: Callable[[str | None], None]
+    ) -> Callable[[], None]:
+        """Execute a long running command and pass each line of stdout to `on_line`.
+
+        Raises:
+            `ExecutionError`
+
+        """
+
+
+class SharedSSHTerminal(BaseSharedTerminal, SSHTerminal):
+    """SSH terminal that shares resources with the other terminals."""
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        host_keys_filename: str | None = None,
+        add_host_keys: bool = DEFAULT_ADD_HOST_KEYS,
+        compress: bool = False,
+        persistent_shell: bool = False,
+        **kwargs,
+    ) -> None:
+        super().__init__(
+            host,
+            host_keys_filename=host_keys_filename,
+            add_host_keys=add_host_keys,
+            **kwargs,
+        )
+        self._client = SharedSSHClient(compress)
+        self._client.set_log_channel("paramiko")
+        if add_host_keys and host_keys_filename:
+            self._client.set_missing_host_key_policy(StoreAddPolicy(host_keys_filename))
+        elif add_host_keys:
+            self._client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        else:
+            self._client.set_missing_host_key_policy(RejectPolicy())
+        self._compress = compress
+        self._persistent_shell = persistent_shell
+        self._shell: paramiko.Channel | None = None
+        self._shell_lock = threading.Lock()
+
+    async def async_connect(self) -> None:
+        await SSH_EXECUTOR.async_run(self._connect)
+
+    async def async_disconnect(self) -> None:
+        await SSH_EXECUTOR.async_run(self._disconnect)
+
+    async def _async_execute(self, string: str, timeout: int) -> CommandOutput:
+        return await SSH_EXECUTOR.async_run(self._execute, string, timeout)
+
+    async def async_load_host_keys(self) -> None:
+        """Load host keys."""
+        await SSH_EXECUTOR.async_run(self._load_host_keys)
+
+    async def async_upload(
+        self, local_path: str, remote_path: str, resume: bool = False
+    ) -> TransferResult:
+        """Upload a file over SFTP.
+
+        Raises:
+            `ExecutionError`
+
+        """
+        return await SSH_EXECUTOR.async_run(
+            self._upload, local_path, remote_path, resume
+        )
+
+    async def async_download(
+        self, remote_path: str, local_path: str, resume: bool = False
+    ) -> TransferResult:
+        """Download a file over SFTP.
+
+        Raises:
+            `ExecutionError`
+
+        """
+        return await SSH_EXECUTOR.async_run(
+            self._download, remote_path, local_path, resume
+        )
+
+    async def async_stream(
+        self, string: str, on_line: Callable[[str | None], None]
+    ) -> Callable[[], None]:
+        """Execute a long running command and pass each line of stdout to `on_line`.
+
+        `on_line` is called with `None` when the command exits, the
+        returned function stops the command.
+
+        Raises:
+            `ExecutionError`
+
+        """
+        loop = asyncio.get_running_loop()
+        channel: paramiko.Channel = await SSH_EXECUTOR.async_run(
+            self._open_stream, string
+        )
+
+        def call(line: str | None) -> None:
+            with suppress(RuntimeError):
+                loop.call_soon_threadsafe(on_line, line)
+
+        def read() -> None:
+            try:
+                for line in channel.makefile("r"):
+                    call(line.rstrip("\n"))
+            except (OSError, paramiko.SSHException, UnicodeDecodeError):
+                pass
+            finally:
+                channel.close()
+                call(None)
+
+        threading.Thread(target=read, name="SSHStream", daemon=True).start()
+        return channel.close
+
+    def _open_stream(self, string: str) -> paramiko.Channel:
+        if not (transport := self._client.get_transport()):
+            raise ExecutionError("Not connected")
+
+        try:
+            channel = transport.open_session()
+            channel.exec_command(string)
+        except (OSError, paramiko.SSHException) as exc:
+            raise ExecutionError(f"Failed to execute command: {exc}") from exc
+
+        return channel
+
+    def _upload(
+        self, local_path: str, remote_path: str, resume: bool
+    ) -> TransferResult:
+        return self._transfer(upload, local_path, remote_path, resume)
+
+    def _download(
+        self, remote_path: str, local_path: str, resume: bool
+    ) -> TransferResult:
+        return self._transfer(download, remote_path, local_path, resume)
+
+    def _transfer(self, func: Callable, *args) -> TransferResult:
+        if not self._client.get_transport():
+            raise ExecutionError("Not connected")
+
+        try:
+            with self._client.open_sftp() as sftp:
+                return func(sftp, *args)
+        except (OSError, paramiko.SSHException) as exc:
+            raise ExecutionError(f"Failed to transfer file: {exc}") from exc
+
+    def _load_host_keys(self) -> None:
+        system_host_keys = host_keys = None
+
+        if self._load_system_host_keys:
+            filename = os.path.expanduser(SYSTEM_HOST_KEYS_FILENAME)
+            system_host_keys = (
+                HOST_KEY_STORE.get(filename)
+                if Path(filename).exists()
+                else paramiko.HostKeys()
+            )
+        if self._host_keys_filename:
+            if not Path(self._host_keys_filename).exists():
+                with Path.open(self._host_keys_filename, "a", encoding="utf-8"):
+                    pass
+            host_keys = HOST_KEY_STORE.get(self._host_keys_filename)
+
+        self._client.use_host_keys(system_host_keys, host_keys)
+
+    def _connect(self) -> None:
+        try:
+            self._load_host_keys()
+        except OSError as exc:
+            raise ConnectError(f"Failed to load host keys: {exc}") from exc
+
+        super()._connect()
+
+    def _disconnect(self) -> None:
+        self._close_shell()
+        super()._disconnect()
+
+    def _close_shell(self) -> None:
+        if shell := self._shell:
+            self._shell = None
+            shell.close()
+
+    def _execute_with_shell(self, string: str, timeout: int) -> CommandOutput:
+        if not self._persistent_shell:
+            return super()._execute_with_shell(string, timeout)
+
+        with self._shell_lock:
+            try:
+                return self._execute_in_shell(ShellCommand(string), timeout)
+            except (TimeoutError, ExecutionError):
+                self._close_shell()
+                raise
+
+    def _execute_in_shell(self, command: ShellCommand, timeout: int) -> CommandOutput:
+        """Execute a command in the shell that stays open between commands.
+
+        Raises:
+            `TimeoutError`
+            `ExecutionError`
+
+        """
+        deadline = time.monotonic() + timeout
+
+        if not self._shell:
+            try:
+                self._shell = self._client.invoke_shell(width=4095)
+            except Exception as exc:
+                raise ExecutionError(f"Failed to open channel: {exc}") from exc
+
+        try:
+            self._shell.sendall(command.input)
+            while True:
+                self._shell.settimeout(max(deadline - time.monotonic(), 0.001))
+                if not (data := self._shell.recv(READ_SIZE)):
+                    raise ExecutionError("Shell closed")
+                if command.feed(data):
+                    return command.get_output()
+        except (TimeoutError, ExecutionError):
+            raise
+        except (OSError, paramiko.SSHException) as exc:
+            raise ExecutionError(f"Failed to read command output: {exc}") from exc
+
+    def _execute_with_limit(
+        self, string: str, timeout: int, limit: int | None
+    ) -> CommandOutput:
+        """Execute with the output limit of a caller in another process."""
+        token = output_limit.set(limit)
+        try:
+            return self._execute(string, timeout)
+        finally:
+            output_limit.reset(token)
+
+    def _execute_without_shell(self, string: str, timeout: int) -> CommandOutput:
+        """Execute a command and read its output up to the output limit.
+
+        The channel is closed as soon as stdout or stderr exceed the
+        limit, so large outputs are never buffered completely. A command
+        stopped that way gets the exit code `OUTPUT_CUT_CODE` unless it
+        exited already.
+        """
+        try:
+            _, stdout, _ = self._client.exec_command(string, timeout=float(timeout))
+        except Exception as exc:
+            raise ExecutionError(f"Failed to execute command: {exc}") from exc
+
+        channel = stdout.channel
+        limit = output_limit.get()
+
+        try:
+            stdout_data, cut = read_limited(channel.recv, limit)
+            if cut:
+                # Stderr doesn't end while stdout is blocked, keep what's there
+                stderr_data = (
+                    channel.recv_stderr(limit + 1)
+                    if channel.recv_stderr_ready()
+                    else b""
+                )
+            else:
+                stderr_data, cut = read_limited(channel.recv_stderr, limit)
+            if not cut:
+                code = channel.recv_exit_status()
+            elif channel.exit_status_ready():
+                code = channel.exit_status
+            else:
+                code = OUTPUT_CUT_CODE
+        except TimeoutError:
+            raise
+        except Exception as exc:
+            raise ExecutionError(f"Failed to read command output: {exc}") from exc
+        finally:
+            channel.close()
+
+        return CommandOutput(
+            string,
+            time.time(),
+            OutputLines(stdout_data),
+            OutputLines(stderr_data),
+            code,
+        )
@@ -11,7 +11,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .base_entity import BaseSensorEntity
+from .base_entity import CoalescingSensorEntity
 from .entry_data import EntryData
 from .helpers import get_child_add_handler, get_child_remove_handler
 
@@ -56,13 +56,13 @@ async def async_get_entities(
     return entities
 
 
-class Entity(BaseSensorEntity, TextEntity):
+class Entity(CoalescingSensorEntity, TextEntity):
     _entity_id_format = ENTITY_ID_FORMAT
     _sensor: TextSensor
 
     @property
     def native_value(self) -> str | None:
-        return self._sensor.value
+        return self._value
 
     @property
     def native_max(self) -> int:
@@ -85,4 +85,4 @@ class Entity(BaseSensorEntity, TextEntity):
         return self._attributes.get(CONF_MODE, TextMode.TEXT)
 
     async def async_set_value(self, value: str) -> None:
-        await self.coordinator.async_set_sensor_value(self.key, value)
+        await self.async_write_value(value)
@@ -0,0 +1,205 @@
+"""File transfers of the SSH integration."""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import os
+import time
+from typing import BinaryIO, TypeVar
+
+import asyncssh
+import paramiko
+from ssh_terminal_manager import ExecutionError, SSHManager
+
+TRANSFER_CHUNK_SIZE = 256 * 1024
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class TransferResult:
+    size: int
+    offset: int
+    duration: float
+
+    @property
+    def transferred(self) -> int:
+        """Number of bytes that were transferred."""
+        return self.size - self.offset
+
+    @property
+    def throughput(self) -> float:
+        """Transferred bytes per second."""
+        return self.transferred / self.duration if self.duration else 0.0
+
+
+def _get_local_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def upload(
+    sftp: paramiko.SFTPClient, local_path: str, remote_path: str, resume: bool
+) -> TransferResult:
+    """Upload a file in chunks, continue at the end of the remote file if `resume`."""
+    start = time.monotonic()
+    size = os.path.getsize(local_path)
+    offset = 0
+
+    if resume:
+        try:
+            offset = sftp.stat(remote_path).st_size or 0
+        except FileNotFoundError:
+            pass
+        if offset > size:
+            offset = 0
+
+    with (
+        open(local_path, "rb") as local,
+        sftp.open(remote_path, "r+b" if offset else "wb") as remote,
+    ):
+        local.seek(offset)
+        remote.seek(offset)
+        remote.set_pipelined(True)
+        while chunk := local.read(TRANSFER_CHUNK_SIZE):
+            remote.write(chunk)
+
+    return TransferResult(size, offset, time.monotonic() - start)
+
+
+def download(
+    sftp: paramiko.SFTPClient, remote_path: str, local_path: str, resume: bool
+) -> TransferResult:
+    """Download a file in chunks, continue at the end of the local file if `resume`."""
+    start = time.monotonic()
+    size = sftp.stat(remote_path).st_size or 0
+    offset = _get_local_size(local_path) if resume else 0
+
+    if offset > size:
+        offset = 0
+
+    with (
+        sftp.open(remote_path, "rb") as remote,
+        open(local_path, "r+b" if offset else "wb") as local,
+    ):
+        local.seek(offset)
+        remote.seek(offset)
+        remote.prefetch(size)
+        while chunk := remote.read(TRANSFER_CHUNK_SIZE):
+            local.write(chunk)
+
+    return TransferResult(size, offset, time.monotonic() - start)
+
+
+async def async_upload(
+    sftp: asyncssh.SFTPClient,
+    local_path: str,
+    remote_path: str,
+    resume: bool,
+    run: Callable[..., Awaitable],
+) -> TransferResult:
+    """Upload a file in chunks, continue at the end of the remote file if `resume`.
+
+    Local file operations are passed to `run`.
+    """
+    start = time.monotonic()
+    size = await run(os.path.getsize, local_path)
+    offset = 0
+
+    if resume:
+        try:
+            offset = (await sftp.stat(remote_path)).size or 0
+        except asyncssh.SFTPNoSuchFile:
+            pass
+        if offset > size:
+            offset = 0
+
+    local: BinaryIO = await run(open, local_path, "rb")
+
+    try:
+        async with sftp.open(
+            remote_path, "r+b" if offset else "wb", encoding=None
+        ) as remote:
+            position = offset
+            while chunk := await run(_read_at, local, position):
+                await remote.write(chunk, position)
+                position += len(chunk)
+    finally:
+        await run(local.close)
+
+    return TransferResult(size, offset, time.monotonic() - start)
+
+
+async def async_download(
+    sftp: asyncssh.SFTPClient,
+    remote_path: str,
+    local_path: str,
+    resume: bool,
+    run: Callable[..., Awaitable],
+) -> TransferResult:
+    """Download a file in chunks, continue at the end of the local file if `resume`.
+
+    Local file operations are passed to `run`.
+    """
+    start = time.monotonic()
+    size = (await sftp.stat(remote_path)).size or 0
+    offset = await run(_get_local_size, local_path) if resume else 0
+
+    if offset > size:
+        offset = 0
+
+    local: BinaryIO = await run(open, local_path, "r+b" if offset else "wb")
+
+    try:
+        async with sftp.open(remote_path, "rb", encoding=None) as remote:
+            position = offset
+            while chunk := await remote.read(TRANSFER_CHUNK_SIZE, position):
+                await run(_write_at, local, position, chunk)
+                position += len(chunk)
+    finally:
+        await run(local.close)
+
+    return TransferResult(size, offset, time.monotonic() - start)
+
+
+def _read_at(file: BinaryIO, position: int) -> bytes:
+    file.seek(position)
+    return file.read(TRANSFER_CHUNK_SIZE)
+
+
+def _write_at(file: BinaryIO, position: int, data: bytes) -> None:
+    file.seek(position)
+    file.write(data)
+
+
+async def async_transfer(
+    manager: SSHManager,
+    disconnect_mode: bool,
+    transfer: Callable[[], Awaitable[_T]],
+) -> _T:
+    """Run a transfer on the connection of a manager.
+
+    The manager connects if needed. In `disconnect_mode` the transfer
+    holds the manager lock, so the connection isn't closed during
+    the transfer, and the manager disconnects afterwards.
+
+    Raises:
+        `ConnectError`
+        `ExecutionError`
+
+    """
+    if not disconnect_mode:
+        await manager.async_connect()
+        if not manager.state.connected:
+            raise ExecutionError("Not connected")
+        return await transfer()
+
+    async with manager.lock:
+        await manager.async_connect()
+        try:
+            return await transfer()
+        finally:
+            await manager.async_disconnect()
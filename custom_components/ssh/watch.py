@@ -0,0 +1,211 @@
+"""Remote file watches of the SSH integration."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import logging
+import posixpath
+import shlex
+
+from ssh_terminal_manager import ExecutionError, SSHManager, State
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import CONF_DISCONNECT_MODE
+from .coordinator import SensorCommandCoordinator
+from .table import TableCommand
+from .tail import TailCommand
+from .terminal import BaseSharedTerminal
+
+_LOGGER = logging.getLogger(__name__)
+
+WATCH_EVENTS = ("close_write", "moved_to", "create", "delete", "attrib")
+WATCH_ESTABLISHED = "Watches established."
+WATCH_RETRY_DELAY = 60
+
+
+def get_watch_string(paths: list[str]) -> str:
+    """Get the command that prints the path of every changed file.
+
+    The directories of the paths are watched, so files that are
+    replaced by renaming them are still noticed. Messages of
+    `inotifywait` are redirected to stdout, `WATCH_ESTABLISHED`
+    is printed as soon as the watch is active.
+    """
+    directories = sorted({posixpath.dirname(path) or "." for path in paths})
+    return " ".join(
+        [
+            "exec inotifywait -m",
+            *(f"-e {event}" for event in WATCH_EVENTS),
+            "--format '%w%f'",
+            *map(shlex.quote, directories),
+            "2>&1",
+        ]
+    )
+
+
+class FileWatch:
+    """Watch channel that refreshes sensor commands when remote files change.
+
+    One `inotifywait` process per device watches the paths of all
+    sensor commands. While it runs, the commands don't poll at their
+    interval and are refreshed as soon as one of their files changes.
+    When it exits, they poll again until the watch is restarted.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        manager: SSHManager,
+        terminal: BaseSharedTerminal,
+        coordinators: list[SensorCommandCoordinator],
+    ) -> None:
+        self._hass = hass
+        self._manager = manager
+        self._terminal = terminal
+        self._coordinators: dict[str, list[SensorCommandCoordinator]] = {}
+        self._stop: Callable[[], None] | None = None
+        self._starting = False
+        self._established = False
+        self._warned = False
+        self._remove_retry: Callable[[], None] | None = None
+
+        for coordinator in coordinators:
+            if not isinstance(coordinator.command, (TableCommand, TailCommand)):
+                continue
+            for path in coordinator.command.watch:
+                self._coordinators.setdefault(posixpath.normpath(path), []).append(
+                    coordinator
+                )
+
+    @property
+    def coordinators(self) -> list[SensorCommandCoordinator]:
+        """The coordinators of the watched sensor commands."""
+        return list(
+            {
+                id(coordinator): coordinator
+                for coordinators in self._coordinators.values()
+                for coordinator in coordinators
+            }.values()
+        )
+
+    async def async_start(self) -> None:
+        """Start the watch process if the manager is connected."""
+        self._cancel_retry()
+
+        if self._stop or self._starting or not self._manager.state.connected:
+            return
+
+        @callback
+        def stream(line: str | None) -> None:
+            if self._stop is stop:
+                self._handle_line(line)
+
+        self._starting = True
+
+        try:
+            stop = await self._terminal.async_stream(
+                get_watch_string(list(self._coordinators)), stream
+            )
+        except ExecutionError as exc:
+            _LOGGER.debug("%s: Failed to start file watch: %s", self._manager.name, exc)
+            self._schedule_retry()
+            return
+        finally:
+            self._starting = False
+
+        self._stop = stop
+        self._established = False
+
+    @callback
+    def stop(self) -> None:
+        """Stop the watch process and poll again."""
+        self._cancel_retry()
+
+        if stop := self._stop:
+            self._stop = None
+            stop()
+            self._set_polling(True)
+
+    @callback
+    def _handle_line(self, line: str | None) -> None:
+        if line is None:
+            self._handle_exit()
+            return
+
+        if line == WATCH_ESTABLISHED and not self._established:
+            self._established = True
+            self._set_polling(False)
+            for coordinator in self.coordinators:
+                self._hass.async_create_task(coordinator.async_request_refresh())
+            return
+
+        for coordinator in self._coordinators.get(posixpath.normpath(line), []):
+            self._hass.async_create_task(coordinator.async_request_refresh())
+
+    @callback
+    def handle_state_change(self, state: State) -> None:
+        """Start the watch process on connect and stop it on disconnect."""
+        if state.connected:
+            self._hass.async_create_task(self.async_start())
+        else:
+            self.stop()
+
+    def _handle_exit(self) -> None:
+        self._stop = None
+
+        if self._established:
+            _LOGGER.debug("%s: File watch stopped", self._manager.name)
+            self._set_polling(True)
+        elif not self._warned:
+            self._warned = True
+            _LOGGER.warning(
+                "%s: Failed to watch files, inotifywait is required on the device",
+                self._manager.name,
+            )
+
+        self._schedule_retry()
+
+    def _set_polling(self, enabled: bool) -> None:
+        for coordinator in self.coordinators:
+            coordinator.set_polling(enabled)
+
+    def _schedule_retry(self) -> None:
+        self._cancel_retry()
+        self._remove_retry = async_call_later(
+            self._hass, WATCH_RETRY_DELAY, self._retry
+        )
+
+    def _cancel_retry(self) -> None:
+        if self._remove_retry:
+            self._remove_retry()
+            self._remove_retry = None
+
+    async def _retry(self, _: datetime) -> None:
+        self._remove_retry = None
+        await self.async_start()
+
+
+async def async_setup_file_watch(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    manager: SSHManager,
+    terminal: BaseSharedTerminal,
+    coordinators: list[SensorCommandCoordinator],
+) -> None:
+    """Watch the files of the sensor commands of a manager with its terminal.
+
+    The watch needs a connection that stays open, so it isn't used
+    in disconnect mode.
+    """
+    watch = FileWatch(hass, manager, terminal, coordinators)
+
+    if not watch.coordinators or entry.options[CONF_DISCONNECT_MODE]:
+        return
+
+    entry.async_on_unload(manager.state.on_change.subscribe(watch.handle_state_change))
+    entry.async_on_unload(watch.stop)
+    await watch.async_start()
@@ -0,0 +1,86 @@
+"""Websocket commands of the SSH integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.const import (
+    ATTR_DEVICE_ID,
+    ATTR_ENTITY_ID,
+    CONF_COMMAND,
+    CONF_TIMEOUT,
+    CONF_VARIABLES,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from .const import CONF_DEADLINE, CONF_MAX_PARALLEL, DEFAULT_MAX_PARALLEL, DOMAIN
+from .entry_data import EntryData
+from .execute import async_iter_command_results
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_execute_command)
+
+
+def get_target_entries(
+    hass: HomeAssistant,
+    device_ids: list[str],
+    entity_ids: list[str],
+) -> list[EntryData]:
+    """Get the entry data of the config entries of devices and entities."""
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+    entry_ids: dict[str, None] = {}
+
+    for entity_id in entity_ids:
+        if (entity := entity_registry.async_get(entity_id)) and entity.config_entry_id:
+            entry_ids[entity.config_entry_id] = None
+
+    for device_id in device_ids:
+        if device := device_registry.async_get(device_id):
+            entry_ids.update(dict.fromkeys(device.config_entries))
+
+    entries = hass.data.get(DOMAIN, {})
+    return [entries[entry_id] for entry_id in entry_ids if entry_id in entries]
+
+
+@websocket_api.require_admin
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "ssh/execute_command",
+        vol.Required(CONF_COMMAND): str,
+        vol.Optional(CONF_TIMEOUT): int,
+        vol.Optional(CONF_VARIABLES): dict,
+        vol.Optional(CONF_MAX_PARALLEL, default=DEFAULT_MAX_PARALLEL): vol.All(
+            int, vol.Range(min=1)
+        ),
+        vol.Optional(CONF_DEADLINE): vol.All(int, vol.Range(min=1)),
+        vol.Optional(ATTR_DEVICE_ID, default=[]): [str],
+        vol.Optional(ATTR_ENTITY_ID, default=[]): [str],
+    }
+)
+@callback
+def websocket_execute_command(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Execute a command on devices and send each result when it is done."""
+    entries = get_target_entries(hass, msg[ATTR_DEVICE_ID], msg[ATTR_ENTITY_ID])
+
+    async def async_send_results() -> None:
+        async for result in async_iter_command_results(hass, entries, msg):
+            connection.send_message(
+                websocket_api.event_message(msg["id"], {"result": result})
+            )
+        connection.send_message(websocket_api.event_message(msg["id"], {"done": True}))
+
+    task = hass.async_create_task(async_send_results())
+    connection.subscriptions[msg["id"]] = task.cancel
+    connection.send_result(msg["id"])
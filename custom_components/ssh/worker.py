@@ -0,0 +1,326 @@
+"""Worker processes of the SSH integration."""
+
+from __future__ import annotations
+
+import asyncio
+import builtins
+from collections.abc import Callable
+import itertools
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import runpy
+import threading
+from typing import Any
+import zlib
+
+import paramiko
+from ssh_terminal_manager import (
+    DEFAULT_PING_TIMEOUT,
+    AuthenticationError,
+    CommandOutput,
+    ConnectError,
+    ExecutionError,
+    HostKeyUnknownError,
+)
+from ssh_terminal_manager.ping import Ping
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant
+
+from .output import output_limit
+from .terminal import HOST_KEY_STORE, BaseSharedTerminal
+from .transfer import TransferResult
+from .worker_process import NOTIFICATION_HOST_KEY, RUN_NAME
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_WORKER_POOL = "ssh_worker_pool"
+WORKER_COUNT = min(os.cpu_count() or 1, 4)
+WORKER_PROCESS_PATH = Path(__file__).with_name("worker_process.py")
+
+ERRORS = {
+    "AuthenticationError": AuthenticationError,
+    "ConnectError": ConnectError,
+    "ExecutionError": ExecutionError,
+    "HostKeyUnknownError": HostKeyUnknownError,
+}
+
+_terminal_ids = itertools.count()
+
+
+def _decode_error(name: str, value: str | None) -> Exception:
+    if cls := ERRORS.get(name):
+        return cls(value)
+    if isinstance(cls := getattr(builtins, name, None), type) and issubclass(
+        cls, Exception
+    ):
+        return cls(value) if value else cls()
+    return ExecutionError(f"{name}: {value}")
+
+
+def _add_host_key(filename: str, hostname: str, key_type: str, data: bytes) -> None:
+    try:
+        key = paramiko.PKey.from_type_string(key_type, data)
+    except (paramiko.SSHException, ValueError) as exc:
+        _LOGGER.warning("Invalid host key of %s from worker: %s", hostname, exc)
+        return
+
+    HOST_KEY_STORE.add(filename, hostname, key)
+
+
+class Worker:
+    """Worker process that owns the SSH transports of a shard of hosts.
+
+    A stopped process is started again by the next call, `generation`
+    counts the starts so terminals know when they have to be created
+    again in the new process.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, name: str) -> None:
+        self._loop = loop
+        self._name = name
+        self._request_ids = itertools.count()
+        self._send_lock = threading.Lock()
+        self._start_lock = asyncio.Lock()
+        self._stopped = False
+        self.generation = 0
+        self._start()
+
+    def _start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        connection, child_connection = context.Pipe()
+        process = context.Process(
+            target=runpy.run_path,
+            args=(str(WORKER_PROCESS_PATH),),
+            kwargs={
+                "init_globals": {
+                    "worker_args": {
+                        "connection": child_connection,
+                        "package": __package__,
+                    }
+                },
+                "run_name": RUN_NAME,
+            },
+            name=self._name,
+            daemon=True,
+        )
+        process.start()
+        child_connection.close()
+        futures: dict[int, asyncio.Future] = {}
+        threading.Thread(
+            target=self._read,
+            args=(connection, futures),
+            name=self._name,
+            daemon=True,
+        ).start()
+        self._connection = connection
+        self._process = process
+        self._futures = futures
+        self.generation += 1
+
+    def _restart(self) -> None:
+        self._stop()
+        self._start()
+
+    def _read(self, connection: Any, futures: dict[int, asyncio.Future]) -> None:
+        while True:
+            try:
+                response = connection.recv()
+            except (EOFError, OSError):
+                break
+            if response[0] is None:
+                if response[1] == NOTIFICATION_HOST_KEY:
+                    _add_host_key(*response[2])
+                continue
+            self._loop.call_soon_threadsafe(self._resolve, futures, *response)
+
+        self._loop.call_soon_threadsafe(self._fail_all, futures)
+
+    def _resolve(
+        self,
+        futures: dict[int, asyncio.Future],
+        request_id: int,
+        success: bool,
+        result: Any,
+    ) -> None:
+        if not (future := futures.pop(request_id, None)) or future.done():
+            return
+        if success:
+            future.set_result(result)
+        else:
+            future.set_exception(_decode_error(*result))
+
+    def _fail_all(self, futures: dict[int, asyncio.Future]) -> None:
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(ExecutionError("Worker process stopped"))
+        futures.clear()
+
+    async def async_ensure_running(self) -> None:
+        """Start the worker process again if it stopped.
+
+        Raises:
+            `ExecutionError`
+
+        """
+        async with self._start_lock:
+            if self._stopped:
+                raise ExecutionError("Worker process stopped")
+            if self._process.is_alive():
+                return
+            _LOGGER.warning(
+                "Worker process %s stopped with exit code %s, starting it again",
+                self._name,
+                self._process.exitcode,
+            )
+            await self._loop.run_in_executor(None, self._restart)
+
+    async def async_call(self, terminal_id: int, method: str, *args) -> Any:
+        """Call a method of a terminal in the worker process.
+
+        Raises:
+            `ExecutionError`
+            Errors of the method
+
+        """
+        await self.async_ensure_running()
+        request_id = next(self._request_ids)
+        future = self._loop.create_future()
+        self._futures[request_id] = future
+
+        try:
+            with self._send_lock:
+                self._connection.send((request_id, terminal_id, method, args))
+        except OSError as exc:
+            self._futures.pop(request_id, None)
+            raise ExecutionError(f"Failed to send to worker process: {exc}") from exc
+
+        return await future
+
+    def _stop(self) -> None:
+        try:
+            with self._send_lock:
+                self._connection.send(None)
+        except OSError:
+            pass
+        self._process.join(5)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._connection.close()
+
+    def stop(self) -> None:
+        """Stop the worker process for good."""
+        self._stopped = True
+        self._stop()
+
+
+class WorkerPool:
+    """Worker processes with a fixed assignment of hosts."""
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, count: int = WORKER_COUNT
+    ) -> None:
+        self._workers = [Worker(loop, f"SSHWorker-{i}") for i in range(count)]
+
+    def get_worker(self, host: str) -> Worker:
+        """Get the worker of a host."""
+        return self._workers[zlib.crc32(host.encode()) % len(self._workers)]
+
+    def stop(self) -> None:
+        """Stop all worker processes."""
+        for worker in self._workers:
+            worker.stop()
+
+
+async def async_get_worker_pool(hass: HomeAssistant) -> WorkerPool:
+    """Get the worker pool, start it if necessary."""
+    if not (future := hass.data.get(DATA_WORKER_POOL)):
+        future = hass.async_add_executor_job(WorkerPool, hass.loop)
+        hass.data[DATA_WORKER_POOL] = future
+
+        async def async_stop(event: Event) -> None:
+            pool = await future
+            await hass.async_add_executor_job(pool.stop)
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop)
+
+    return await future
+
+
+class ProcessSSHTerminal(BaseSharedTerminal):
+    """SSH terminal whose transport is owned by a worker process.
+
+    The terminal is created in the worker process with the same
+    arguments, only pinging runs in Home Assistant.
+    """
+
+    def __init__(self, host: str, *, worker: Worker, **kwargs) -> None:
+        self._host = host
+        self._ping = Ping(host, kwargs.get("ping_timeout", DEFAULT_PING_TIMEOUT))
+        self._worker = worker
+        self._kwargs = kwargs
+        self._id = next(_terminal_ids)
+        self._generation: int | None = None
+
+    @property
+    def host(self) -> str:
+        return self._host
+
+    async def _async_call(self, method: str, *args) -> Any:
+        await self._worker.async_ensure_running()
+
+        if self._generation != self._worker.generation:
+            generation = self._worker.generation
+            await self._worker.async_call(self._id, "create", self.host, self._kwargs)
+            self._generation = generation
+
+        return await self._worker.async_call(self._id, method, *args)
+
+    async def async_ping(self) -> None:
+        await self._ping.async_ping()
+
+    async def async_connect(self) -> None:
+        await self._async_call("_connect")
+
+    async def async_disconnect(self) -> None:
+        await self._async_call("_disconnect")
+
+    async def _async_execute(self, string: str, timeout: int) -> CommandOutput:
+        return await self._async_call(
+            "_execute_with_limit", string, timeout, output_limit.get()
+        )
+
+    async def async_load_host_keys(self) -> None:
+        """Load host keys."""
+        await self._async_call("_load_host_keys")
+
+    async def async_upload(
+        self, local_path: str, remote_path: str, resume: bool = False
+    ) -> TransferResult:
+        """Upload a file over SFTP from the worker process."""
+        return await self._async_call("_upload", local_path, remote_path, resume)
+
+    async def async_download(
+        self, remote_path: str, local_path: str, resume: bool = False
+    ) -> TransferResult:
+        """Download a file over SFTP from the worker process."""
+        return await self._async_call("_download", remote_path, local_path, resume)
+
+    async def async_stream(
+        self, string: str, on_line: Callable[[str | None], None]
+    ) -> Callable[[], None]:
+        """Streaming isn't supported by the worker process.
+
+        Raises:
+            `ExecutionError`
+
+        """
+        raise ExecutionError("Streaming is not supported by the process backend")
+
+    async def async_close(self) -> None:
+        """Disconnect and remove the terminal from the worker process."""
+        if self._generation == self._worker.generation:
+            self._generation = None
+            await self._worker.async_call(self._id, "remove")
@@ -0,0 +1,97 @@
+"""Worker process of the SSH integration.
+
+Worker processes run this file with `runpy.run_path`, so that they
+don't import the integration package and Home Assistant. The package
+is registered without running its `__init__` before the terminal
+module is imported.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import importlib
+from multiprocessing.connection import Connection
+from pathlib import Path
+import sys
+import threading
+import types
+from typing import Any
+
+from ssh_terminal_manager import HostKeyUnknownError
+
+RUN_NAME = "ssh_worker_process"
+NOTIFICATION_HOST_KEY = "host_key"
+
+
+def encode_error(exc: BaseException) -> tuple[str, str | None]:
+    """Encode an error as class name and details to send it to the parent."""
+    if isinstance(exc, HostKeyUnknownError):
+        return exc.__class__.__name__, exc.host
+    return exc.__class__.__name__, getattr(exc, "details", None) or str(exc) or None
+
+
+def _import_terminal_module(package: str) -> types.ModuleType:
+    if package not in sys.modules:
+        module = types.ModuleType(package)
+        module.__path__ = [str(Path(__file__).parent)]
+        sys.modules[package] = module
+
+    return importlib.import_module(f"{package}.terminal")
+
+
+def main(connection: Connection, package: str) -> None:
+    """Handle the requests of the parent process until it disconnects.
+
+    Requests are tuples of request ID, terminal ID, method and arguments.
+    Responses are tuples of request ID, success and result. Host keys
+    added by the terminals are sent with the request ID `None`, the
+    parent process writes them to the host keys files.
+    """
+    terminal_module = _import_terminal_module(package)
+    terminals: dict[int, Any] = {}
+    send_lock = threading.Lock()
+
+    def send(message: tuple) -> None:
+        with send_lock:
+            connection.send(message)
+
+    def forward_host_key(filename: str, hostname: str, key: Any) -> None:
+        send(
+            (
+                None,
+                NOTIFICATION_HOST_KEY,
+                (filename, hostname, key.get_name(), key.asbytes()),
+            )
+        )
+
+    def handle(request_id: int, terminal_id: int, method: str, args: tuple) -> None:
+        try:
+            if method == "create":
+                terminals[terminal_id] = terminal_module.SharedSSHTerminal(
+                    args[0], **args[1]
+                )
+                result = None
+            elif method == "remove":
+                result = terminals.pop(terminal_id)._disconnect()
+            else:
+                result = getattr(terminals[terminal_id], method)(*args)
+        except Exception as exc:  # noqa: BLE001
+            send((request_id, False, encode_error(exc)))
+        else:
+            send((request_id, True, result))
+
+    terminal_module.HOST_KEY_STORE.forward = forward_host_key
+
+    with ThreadPoolExecutor(thread_name_prefix="SSHWorker") as executor:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            executor.submit(handle, *message)
+
+
+if __name__ == RUN_NAME:
+    main(**globals()["worker_args"])
@@ -0,0 +1,85 @@
+"""Benchmark the updates of dynamic sensors by table commands.
+
+Runs a command with one static and two dynamic sensors over a table
+of `ROWS` rows and prints the time of the first update, an update
+with the same table, an update with changed values and an update
+where half of the IDs changed, for `TableCommand` with table sensors
+and for `SensorCommand` with the sensors of the library.
+
+Requires `ssh-terminal-manager`, Home Assistant isn't needed:
+
+    python scripts/benchmark_table.py [ROWS]
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+import sys
+import time
+
+from ssh_terminal_manager import CommandOutput, NumberSensor, SensorCommand
+
+ROWS = 10_000
+TABLE_PATH = Path(__file__).parents[1] / "custom_components" / "ssh" / "table.py"
+
+spec = importlib.util.spec_from_file_location("table", TABLE_PATH)
+table = sys.modules[spec.name] = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(table)
+
+
+class Manager:
+    """Manager that discards the log."""
+
+    def log(self, message: str) -> None:
+        """Discard a message."""
+
+
+def get_command(command_class: type, sensor_class: type) -> SensorCommand:
+    """Get a command with one static and two dynamic sensors."""
+    return command_class(
+        "table",
+        separator=",",
+        sensors=[
+            NumberSensor(key="count"),
+            sensor_class(key="cpu", dynamic=True),
+            sensor_class(key="memory", dynamic=True),
+        ],
+    )
+
+
+def get_lines(rows: int, start: int = 0, value: int = 0) -> list[str]:
+    """Get the output lines of a table."""
+    return [str(rows)] + [
+        f"p{i},{i + value},{i * 2 + value}" for i in range(start, start + rows)
+    ]
+
+
+def update(command: SensorCommand, lines: list[str]) -> float:
+    """Update the sensors of a command and return the seconds it took."""
+    start = time.perf_counter()
+    command.handle_success(Manager(), CommandOutput("", 0, lines, [], 0))
+    return time.perf_counter() - start
+
+
+def main(rows: int) -> None:
+    """Run the benchmark."""
+    for name, command_class, sensor_class in (
+        ("TableCommand", table.TableCommand, table.TableNumberSensor),
+        ("SensorCommand", SensorCommand, NumberSensor),
+    ):
+        command = get_command(command_class, sensor_class)
+        times = [
+            update(command, get_lines(rows)),
+            update(command, get_lines(rows)),
+            update(command, get_lines(rows, value=1)),
+            update(command, get_lines(rows, rows // 2, 1)),
+        ]
+        print(
+            f"{name} {rows} rows: first {times[0]:.3f}s, same {times[1]:.3f}s,"
+            f" changed values {times[2]:.3f}s, changed IDs {times[3]:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)